@@ -1,14 +1,7 @@
-import sys
-
 from discord.ext import commands
 
 import internal.constants as constants
-
-if len(sys.argv) > 1:
-    if sys.argv[1] == "test":
-        from internal import constants_bot_test as constants_bot
-else:
-    from internal import constants_bot_prod as constants_bot
+from internal import constants_bot
 
 
 class MapHelp(commands.Cog, name="Helpful Map Commands"):
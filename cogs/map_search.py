@@ -1,16 +1,9 @@
-import sys
-
 from discord.ext import commands
 
 import internal.constants as constants
+from internal import constants_bot
 from internal.map_utils import searchmap, normal_map_query, convert_short_types
 
-if len(sys.argv) > 1:
-    if sys.argv[1] == "test":
-        from internal import constants_bot_test as constants_bot
-else:
-    from internal import constants_bot_prod as constants_bot
-
 
 class MapSearch(commands.Cog, name="Map Search"):
     """A collection of map search commands."""
@@ -1,18 +1,10 @@
-import re
-import sys
-from pymongo import ASCENDING, DESCENDING
 import discord
 from discord.ext import commands
 
 import internal.constants as constants
-from database.MapData import MapData
-from internal.map_utils import searchmap, convert_short_types
-
-if len(sys.argv) > 1:
-    if sys.argv[1] == "test":
-        from internal import constants_bot_test as constants_bot
-else:
-    from internal import constants_bot_prod as constants_bot
+from internal import constants_bot, embed_layout
+from internal.map_catalog import map_catalog
+from internal.map_utils import searchmap, display_maps, convert_short_types
 
 
 class MapSearchTypes(commands.Cog, name="Map Search"):
@@ -146,46 +138,63 @@ class MapSearchTypes(commands.Cog, name="Map Search"):
         await searchmap(ctx, query, map_name=map_name)
 
     @commands.command(
-        help="Lists most recent submitted maps which are not labeled as NOSTALGIA.",
+        help=(
+            "Lists most recent submitted maps.\n"
+            "[map_type] is optional and filters by map type.\n"
+            "[map_code] is optional. Lists maps submitted before that map code, to browse older maps."
+        ),
         brief="Lists most recent submitted maps",
         aliases=["new", "latest"],
     )
-    async def newest(self, ctx, map_type=""):
+    async def newest(self, ctx, map_type="", map_code=""):
         """Show newest maps.
 
-        Display constants_bot.NEWEST_MAPS_LIMIT amount of maps that were submitted
+        Display constants.NEWEST_MAPS_LIMIT amount of maps that were submitted,
+        newest first. A map_code pages to maps submitted before that map.
         """
-        embed = discord.Embed(title="Newest Maps")
-
-        row = 0
-        query = {}
         map_type = convert_short_types(map_type.upper())
+
+        # Allow paging without a map_type, e.g. /newest <map_code>
+        if map_type and map_type not in constants.TYPES_OF_MAP and not map_code:
+            map_type, map_code = "", map_type
+
         if map_type:
             if map_type not in constants.TYPES_OF_MAP:
                 await ctx.send(
                     f"{map_type} not in map types. Use `/maptypes` for a list of acceptable map types."
                 )
                 return
-            query = {"type": map_type}
-        count = await MapData.count_documents(query)
-        # async for entry in MapData.find(query).sort(
-        #             [("_id", ASCENDING)]
-        #         ).limit(
-        #     constants.NEWEST_MAPS_LIMIT
-        # ):
-        async for entry in MapData.find(query).skip(
-            (count - constants.NEWEST_MAPS_LIMIT)
-            if count > constants.NEWEST_MAPS_LIMIT
-            else 0
-        ):
-            embed.add_field(
-                name=f"{entry.code} - {constants.PRETTY_NAMES[entry.map_name]}",
-                value=f"> Creator: {entry.creator}\n> Map Types: {', '.join(entry.type)}\n> Description: {entry.desc}",
-                inline=False,
-            )
-            row = 1
-        if row:
-            await ctx.send(embed=embed)
+
+        before = None
+        if map_code:
+            found = await map_catalog.find({"code": map_code.upper()})
+            if not found:
+                await ctx.send(f"{map_code.upper()} does not exist!")
+                return
+            before = found[0]
+
+        entries = await map_catalog.newest(
+            constants.NEWEST_MAPS_LIMIT, map_type=map_type, before=before
+        )
+        embeds = embed_layout.pack(
+            "Newest Maps",
+            (
+                (
+                    f"{entry.code} - {constants.PRETTY_NAMES[entry.map_name]}",
+                    [
+                        f"> Creator: {entry.creator}\n> Map Types: {', '.join(entry.type)}\n> Description: {entry.desc}"
+                    ],
+                )
+                for entry in entries
+            ),
+        )
+        if embeds:
+            if len(entries) == constants.NEWEST_MAPS_LIMIT:
+                embeds[-1].set_footer(
+                    text=f"Older maps: {ctx.prefix}newest {map_type + ' ' if map_type else ''}{entries[-1].code}"
+                )
+            for embed in embeds:
+                await ctx.send(embed=embed)
         else:
             await ctx.send("No latest maps!")
 
@@ -195,8 +204,8 @@ class MapSearchTypes(commands.Cog, name="Map Search"):
     )
     async def creator(self, ctx, creator):
         """Search for and display maps by a certain creator."""
-        query = {"creator": re.compile(re.escape(creator), re.IGNORECASE)}
-        await searchmap(ctx, query, creator=creator.capitalize())
+        entries = await map_catalog.search_creator(creator)
+        await display_maps(ctx, entries, creator.capitalize())
 
     @commands.command(
         help="Search for the creator/details of a map. Enter <map_code> to find the details of that code.",
@@ -208,7 +217,7 @@ class MapSearchTypes(commands.Cog, name="Map Search"):
         code = map_code.upper()
         query = {"code": code}
         embed = None
-        async for entry in MapData.find(query):
+        for entry in await map_catalog.find(query):
             embed = discord.Embed()
             embed.add_field(
                 name=f"{entry.code} - {constants.PRETTY_NAMES[entry.map_name]}",
@@ -0,0 +1,130 @@
+import json
+
+import discord
+from discord.ext import commands
+
+from internal import constants_bot, embed_layout
+from internal.board_cache import board_cache
+from internal.db_monitor import db_monitor
+from internal.metrics import metrics
+from internal.outbound import outbound
+from internal.reactions import reactions
+from internal.slow_queries import RECENT_ENTRIES, slow_query_log
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}"
+
+
+class Stats(commands.Cog, name="Stats"):
+    """Bot performance statistics for mods."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_check(self, ctx):
+        """Check if author has a whitelisted role."""
+        if ctx.guild is not None and any(
+            role.id in constants_bot.ROLE_WHITELIST for role in ctx.author.roles
+        ):
+            return True
+
+    @commands.command(
+        help="Shows latency, error and database/Discord call statistics for the most used commands.",
+        brief="Shows command statistics",
+        hidden=True,
+    )
+    async def stats(self, ctx):
+        """Display a summary of the collected metrics."""
+        embed = discord.Embed(title="Command statistics")
+        busiest = sorted(
+            metrics.commands.items(),
+            key=lambda item: item[1].latency.count,
+            reverse=True,
+        )[:10]
+        for name, command in busiest:
+            count = command.latency.count
+            embed.add_field(
+                name=f"{name} - {count} runs, {command.errors} errors",
+                value=(
+                    f"> Mean: {_ms(command.latency.sum / count)} ms, "
+                    f"p50 ≤ {_ms(command.latency.quantile(0.5))} ms, "
+                    f"p95 ≤ {_ms(command.latency.quantile(0.95))} ms\n"
+                    f"> DB: {command.db_calls / count:.1f} calls, "
+                    f"{_ms(command.db_seconds / count)} ms per run\n"
+                    f"> Discord: {command.http_calls / count:.1f} calls, "
+                    f"{_ms(command.http_seconds / count)} ms per run"
+                ),
+                inline=False,
+            )
+        if not busiest:
+            embed.description = "No commands have run yet."
+
+        pool = db_monitor.snapshot()
+        embed.add_field(
+            name="Database pool",
+            value=(
+                f"> In use: {pool['checked_out']}/{pool['max_pool_size']} "
+                f"(peak {pool['max_checked_out']})\n"
+                f"> Waiting: {pool['waiting']} (peak {pool['max_waiting']})"
+            ),
+            inline=False,
+        )
+        embed.add_field(
+            name="Discord",
+            value=(
+                f"> Gateway latency: {_ms(self.bot.latency)} ms\n"
+                f"> Scheduled calls: {sum(outbound.calls.values())}, "
+                f"coalesced: {sum(outbound.coalesced.values())}\n"
+                f"> Menus waiting for reactions: {reactions.pending}"
+            ),
+            inline=False,
+        )
+        embed.add_field(
+            name="Board cache",
+            value=f"> Hits: {board_cache.hits}, misses: {board_cache.misses}",
+            inline=False,
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(
+        help="Shows the most recent database operations slower than the slow query threshold, with their query plans.",
+        brief="Shows recent slow database operations",
+        hidden=True,
+    )
+    async def slowqueries(self, ctx, count: int = 10):
+        """Display the last [count] slow database operations."""
+        count = max(1, min(count, RECENT_ENTRIES))
+        entries = list(slow_query_log.recent)[-count:]
+        if not entries:
+            await ctx.send("No slow queries recorded.")
+            return
+
+        groups = []
+        for entry in reversed(entries):
+            lines = [
+                f"> {entry['time']} - {entry['duration_ms']} ms"
+                f"{' (failed)' if entry['failed'] else ''}\n",
+                f"> Command: {entry['command'] or 'none'}\n",
+                f"> Shape: `{json.dumps(entry['shape'])}`\n",
+            ]
+            explain = entry.get("explain")
+            if explain and "error" not in explain:
+                lines.append(
+                    f"> Plan: {' > '.join(explain['stages'])}"
+                    f"{' on ' + ', '.join(explain['indexes']) if explain['indexes'] else ''}\n"
+                )
+                lines.append(
+                    f"> Examined {explain['keys_examined']} keys, "
+                    f"{explain['docs_examined']} docs, returned {explain['returned']}\n"
+                )
+            groups.append(
+                (f"{entry['operation']} {entry['collection']}", ["".join(lines)])
+            )
+        for embed in embed_layout.pack("Slow queries", groups, max_fields=10):
+            await ctx.send(embed=embed)
+
+
+def setup(bot):
+    """Add Cog to Discord bot."""
+    bot.add_cog(Stats(bot))
@@ -1,11 +1,11 @@
 import re
-import sys
 
 from discord.ext import commands
 
 import internal.constants as constants
 from database.MapData import MapData
-from internal import confirmation
+from internal import confirmation, constants_bot
+from internal.map_catalog import map_catalog
 from internal.map_utils import (
     map_submit_embed,
     map_edit_confirmation,
@@ -14,12 +14,6 @@ from internal.map_utils import (
     map_name_converter,
 )
 
-if len(sys.argv) > 1:
-    if sys.argv[1] == "test":
-        from internal import constants_bot_test as constants_bot
-else:
-    from internal import constants_bot_prod as constants_bot
-
 
 class SubmitMap(commands.Cog, name="Map submission/deletion/editing"):
     """Commands to submit, delete, and edit maps."""
@@ -103,6 +97,7 @@ class SubmitMap(commands.Cog, name="Map submission/deletion/editing"):
                 content=f"{constants.CONFIRM_REACTION_EMOJI} Confirmed! Map submission accepted."
             )
             await submission.commit()
+            map_catalog.upsert(submission)
         elif confirmed is False:
             await msg.edit(
                 content=f"{constants.CANCEL_REACTION_EMOJI} Map submission rejected."
@@ -133,6 +128,7 @@ class SubmitMap(commands.Cog, name="Map submission/deletion/editing"):
         if confirmed is True:
             await msg.edit(content=f"{search.code} has been deleted.")
             await search.delete()
+            map_catalog.remove(search)
         elif confirmed is False:
             await msg.edit(content=f"{search.code} has not been deleted.")
         elif confirmed is None:
@@ -1,21 +1,15 @@
 import re
-import sys
 
 import discord
-from aiostream import stream
 from discord.ext import commands
-from pymongo.collation import Collation
 
 import internal.constants as constants
 import internal.pb_utils
-from database.WorldRecords import WorldRecords
-from internal import confirmation
-
-if len(sys.argv) > 1:
-    if sys.argv[1] == "test":
-        from internal import constants_bot_test as constants_bot
-else:
-    from internal import constants_bot_prod as constants_bot
+from database.WorldRecords import WorldRecords, level_key
+from internal import confirmation, constants_bot, embed_layout
+from internal.board_cache import board_cache
+from internal.outbound import outbound
+from internal.wr_table import wr_table
 
 
 class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion"):
@@ -60,28 +54,23 @@ class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion")
             return
 
         # Find currently associated levels
-        level_checker = {}
-        async for entry in (
-            WorldRecords.find({"code": map_code})
-            .sort([("level", 1), ("record", 1)])
-            .collation(Collation(locale="en_US", numericOrdering=True))
-            .limit(30)
-        ):
-            if entry.level.upper() not in level_checker.keys():
-                level_checker[entry.level.upper()] = None
+        levels = await wr_table.levels(map_code)
 
         # init embed
         embed = discord.Embed(title="Is this correct?")
         embed.add_field(
             name="Currently submitted level names:",
-            value=f"{', '.join(level_checker) if level_checker else 'N/A'}",
+            value=embed_layout.truncate(
+                ", ".join(levels) if levels else "N/A",
+                embed_layout.FIELD_VALUE_LIMIT,
+            ),
         )
 
         # Finds document
         submission = await WorldRecords.find_one(
             {
                 "code": map_code,
-                "level": re.compile(re.escape(level), re.IGNORECASE),
+                "level_key": level_key(level),
                 "posted_by": ctx.author.id,
             }
         )
@@ -133,19 +122,22 @@ class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion")
             try:
                 hidden_msg = await channel.fetch_message(submission.hidden_id)
                 if hidden_msg:
-                    await hidden_msg.delete()
+                    outbound.delete(hidden_msg)
             # If not found, HTTPException is thrown, safely ignore
             except discord.errors.HTTPException:
                 pass
             finally:
-                await msg.edit(content="Submission accepted")
+                outbound.edit(msg, content="Submission accepted")
 
                 # New hidden message
-                hidden_msg = await channel.send(
-                    f"{ctx.author.name} needs verification!\n{submission.code} - Level {submission.level} - {internal.pb_utils.display_record(record_in_seconds)}\n{ctx.message.jump_url}"
+                hidden_msg = await outbound.send(
+                    channel,
+                    f"{ctx.author.name} needs verification!\n{submission.code} - Level {submission.level} - {internal.pb_utils.display_record(record_in_seconds)}\n{ctx.message.jump_url}",
                 )
 
                 # Update submission
+                old_message_id = submission.message_id
+                created = not submission.is_created
                 submission.record = record_in_seconds
                 submission.message_id = ctx.message.id
                 submission.url = ctx.message.jump_url
@@ -155,30 +147,25 @@ class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion")
 
                 # Save document
                 await submission.commit()
+                await internal.pb_utils.record_saved(
+                    submission, created, old_message_id
+                )
 
                 # verification reacts
-                await ctx.message.add_reaction(constants.VERIFIED_EMOJI)
-                await ctx.message.add_reaction(constants.NOT_VERIFIED_EMOJI)
+                outbound.add_reactions(
+                    ctx.message, constants.VERIFIED_EMOJI, constants.NOT_VERIFIED_EMOJI
+                )
 
                 # Find top 10 records and display submission's place in top 10.
-                top_10 = (
-                    WorldRecords.find(
-                        {
-                            "code": map_code,
-                            "level": re.compile(re.escape(level), re.IGNORECASE),
-                        }
-                    )
-                    .sort("record", 1)
-                    .limit(10)
+                top_10 = await board_cache.get(
+                    map_code, level_key(level), verified_only=False
                 )
-                en = stream.enumerate(top_10)
-                async with en.stream() as streamer:
-                    async for rank, entry in streamer:
-                        if submission:
-                            if entry.pk == submission.pk:
-                                await ctx.channel.send(
-                                    f"Your rank is {rank + 1} on the unverified scoreboard."
-                                )
+                for rank, entry in enumerate(top_10):
+                    if entry.id == submission.pk:
+                        outbound.send(
+                            ctx.channel,
+                            f"Your rank is {rank + 1} on the unverified scoreboard.",
+                        )
 
         elif confirmed is False:
             await msg.edit(
@@ -207,7 +194,7 @@ class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion")
             search = await WorldRecords.find_one(
                 {
                     "code": map_code,
-                    "level": re.compile(re.escape(level), re.IGNORECASE),
+                    "level_key": level_key(level),
                     "$or": [{"posted_by": name_id}, {"name": name}],
                 }
             )
@@ -215,7 +202,7 @@ class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion")
             search = await WorldRecords.find_one(
                 {
                     "code": map_code,
-                    "level": re.compile(re.escape(level), re.IGNORECASE),
+                    "level_key": level_key(level),
                     "name": name,
                 }
             )
@@ -254,6 +241,7 @@ class SubmitPersonalBest(commands.Cog, name="Personal best submission/deletion")
         if confirmed is True:
             await msg.edit(content="Personal best deleted succesfully.")
             await search.delete()
+            await internal.pb_utils.record_deleted(search)
         elif confirmed is False:
             await msg.edit(content="Personal best was not deleted.")
         elif confirmed is None:
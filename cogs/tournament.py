@@ -1,4 +1,4 @@
-import sys
+import typing
 
 import discord
 from discord.ext import commands
@@ -7,20 +7,17 @@ from database.BonusData import BonusData
 from database.HardcoreData import HardcoreData
 from database.MildcoreData import MildcoreData
 from database.TimeAttackData import TimeAttackData
+from internal import confirmation, constants_bot
+from internal.members import resolve_member
 from internal.pb_utils import time_convert, display_record
 from internal.tournament_utils import (
     category_sort,
     tournament_boards,
     confirm_collection_drop,
+    delete_exported,
     exporter,
 )
 
-if len(sys.argv) > 1:
-    if sys.argv[1] == "test":
-        from internal import constants_bot_test as constants_bot, confirmation
-else:
-    from internal import constants_bot_prod as constants_bot
-
 
 def viewable_channels():
     def predicate(ctx):
@@ -114,7 +111,7 @@ class Tournament(commands.Cog, name="Tournament"):
         embed = discord.Embed(title="Is this correct?")
         # Verification embed for user.
         embed.add_field(
-            name=f"Name: {discord.utils.find(lambda m: m.id == search.posted_by, ctx.guild.members).name}",
+            name=f"Name: {ctx.author.name}",
             value=(
                 f"> Category: {category}\n"
                 f"> Record: {display_record(record_in_seconds)}\n"
@@ -144,11 +141,11 @@ class Tournament(commands.Cog, name="Tournament"):
             )
 
     @commands.command(
-        help="Delete a submission to tournament. Optional argument <user> for mod usage.",
+        help="Delete a submission to tournament. Optional argument <user> (mention or user id) for mod usage.",
         brief="Delete a submission to tournament",
         name="delete"
     )
-    async def _delete(self, ctx, user: discord.Member = None):
+    async def _delete(self, ctx, user: typing.Union[discord.User, int] = None):
         category = category_sort(ctx.message)
         if category is None:
             return
@@ -164,9 +161,8 @@ class Tournament(commands.Cog, name="Tournament"):
             _category_data = BonusData
 
         if user is None:
-            search_id = ctx.author.id
-        else:
-            search_id = user.id
+            user = ctx.author
+        search_id = user if isinstance(user, int) else user.id
 
         search = await _category_data.find_one({"posted_by": search_id})
 
@@ -186,9 +182,15 @@ class Tournament(commands.Cog, name="Tournament"):
                 )
                 return
 
+        if isinstance(user, int):
+            # An id of a user the bot hasn't cached, e.g. without the members intent.
+            member = await resolve_member(ctx.guild, user)
+            name = member.name if member else user
+        else:
+            name = user.name
         embed = discord.Embed(title="Do you want to delete this?")
         embed.add_field(
-            name=f"Name: {discord.utils.find(lambda m: m.id == search.posted_by, ctx.guild.members).name}",
+            name=f"Name: {name}",
             value=(
                 f"> Category: {category}\n"
                 f"> Record: {display_record(search.record)}\n"
@@ -210,8 +212,6 @@ class Tournament(commands.Cog, name="Tournament"):
             )
 
 
-
-
     @commands.group(pass_context=True, case_insensitive=True)
     @viewable_channels()
     async def view(self, ctx):
@@ -343,8 +343,16 @@ class Tournament(commands.Cog, name="Tournament"):
         if confirmed is True:
             channel = self.bot.get_channel(constants_bot.EXPORT_SS_CHANNEL_ID)
             await confirmation_msg.edit(content="Clearing screenshots...")
-            deleted = await channel.purge(limit=100)
-            await confirmation_msg.edit(content=f"{len(deleted)} screenshots have been deleted.")
+
+            async def progress(deleted, total):
+                await confirmation_msg.edit(
+                    content=f"Clearing screenshots... {deleted}/{total}"
+                )
+
+            deleted = await delete_exported(channel, progress)
+            await confirmation_msg.edit(
+                content=f"{deleted} screenshots have been deleted."
+            )
 
         elif confirmed is False:
             await confirmation_msg.edit(
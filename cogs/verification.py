@@ -1,17 +1,13 @@
 import logging
-import sys
 
 from discord.ext import commands
 
 import internal.constants as constants
 import internal.pb_utils
 from database.WorldRecords import WorldRecords
-
-if len(sys.argv) > 1:
-    if sys.argv[1] == "test":
-        from internal import constants_bot_test as constants_bot
-else:
-    from internal import constants_bot_prod as constants_bot
+from internal import constants_bot
+from internal.message_index import message_index
+from internal.outbound import outbound
 
 
 class Verification(commands.Cog, name="Verification"):
@@ -19,6 +15,7 @@ class Verification(commands.Cog, name="Verification"):
 
     def __init__(self, bot):
         self.bot = bot
+        self.bot.loop.create_task(message_index.ensure_loaded())
 
     async def cog_check(self, ctx):
         """Check if channel is RECORD_CHANNEL."""
@@ -30,6 +27,11 @@ class Verification(commands.Cog, name="Verification"):
         """Listen for verification reaction from moderators."""
         if payload.user_id == constants_bot.BOT_ID:
             return
+        # Most reactions aren't on submissions; one dict lookup rules them out.
+        await message_index.ensure_loaded()
+        record_id = message_index.get(payload.message_id)
+        if record_id is None:
+            return
         if not bool(
             any(
                 role.id in constants_bot.ROLE_WHITELIST for role in payload.member.roles
@@ -37,7 +39,7 @@ class Verification(commands.Cog, name="Verification"):
         ):
             return
         if payload is not None:
-            search = await WorldRecords.find_one({"message_id": payload.message_id})
+            search = await WorldRecords.find_one({"_id": record_id})
             if search is not None and payload.message_id == search.message_id:
                 guild = self.bot.get_guild(payload.guild_id)
                 channel = guild.get_channel(payload.channel_id)
@@ -47,7 +49,7 @@ class Verification(commands.Cog, name="Verification"):
                 )
                 try:
                     hidden_msg = await hidden_channel.fetch_message(search.hidden_id)
-                    await hidden_msg.delete()
+                    outbound.delete(hidden_msg)
                 except:
                     pass
                 finally:
@@ -55,6 +57,7 @@ class Verification(commands.Cog, name="Verification"):
                         if str(payload.emoji) == constants.VERIFIED_EMOJI:
                             search.verified = True
                             await search.commit()
+                            await internal.pb_utils.record_saved(search)
                             await msg.author.send(
                                 f"Your submission has been verified by {payload.member.name}!\n```Map Code: {search.code}{constants.NEW_LINE}Level: {search.level}{constants.NEW_LINE}Record: {internal.pb_utils.display_record(search.record)}```{msg.jump_url}"
                             )
@@ -62,13 +65,14 @@ class Verification(commands.Cog, name="Verification"):
                         elif str(payload.emoji) == constants.NOT_VERIFIED_EMOJI:
                             search.verified = False
                             await search.commit()
+                            await internal.pb_utils.record_saved(search)
                             await msg.author.send(
                                 f"{payload.member.name} has rejected your submission and is not verified!\n```Map Code: {search.code}{constants.NEW_LINE}Level: {search.level}{constants.NEW_LINE}Record: {internal.pb_utils.display_record(search.record)}```{msg.jump_url}"
                             )
                     except:
                         pass
                     finally:
-                        await msg.clear_reactions()
+                        outbound.clear_reactions(msg)
 
     @commands.Cog.listener()
     async def on_raw_message_delete(self, payload=None):
@@ -78,7 +82,11 @@ class Verification(commands.Cog, name="Verification"):
         the record is deleted from the database.
         """
         if payload is not None:
-            search = await WorldRecords.find_one({"message_id": payload.message_id})
+            await message_index.ensure_loaded()
+            record_id = message_index.get(payload.message_id)
+            if record_id is None:
+                return
+            search = await WorldRecords.find_one({"_id": record_id})
             if search is not None:
                 channel = self.bot.get_channel(
                     constants_bot.HIDDEN_VERIFICATION_CHANNEL
@@ -90,8 +98,8 @@ class Verification(commands.Cog, name="Verification"):
                 except:
                     pass
                 finally:
-
                     await search.delete()
+                    await internal.pb_utils.record_deleted(search)
 
 
 def setup(bot):
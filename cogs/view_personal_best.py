@@ -1,25 +1,16 @@
 import logging
 import re
-import sys
-from natsort import natsorted
 import bson
 import discord
-import pymongo
 from discord.ext import commands
-from disputils import BotEmbedPaginator
-from pymongo.collation import Collation
 
 import internal.constants as constants
 import internal.pb_utils
-from database.MapData import MapData
-from database.WorldRecords import WorldRecords
+from internal import constants_bot, embed_layout
+from database.WorldRecords import level_key
+from internal.paginator import LazyPaginator
 from internal.pb_utils import boards
-
-if len(sys.argv) > 1:
-    if sys.argv[1] == "test":
-        from internal import constants_bot_test as constants_bot
-else:
-    from internal import constants_bot_prod as constants_bot
+from internal.wr_table import wr_table
 
 
 class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
@@ -29,6 +20,7 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
 
     def __init__(self, bot):
         self.bot = bot
+        self.bot.loop.create_task(wr_table.ensure_loaded())
 
     async def cog_check(self, ctx):
         """Check if channel is RECORD_CHANNEL."""
@@ -53,78 +45,44 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
         else:
             query = {"name": re.compile(re.escape(name), re.IGNORECASE)}
 
-        embed_dict = {}
-        cur_map = None
-        async for entry in WorldRecords.find(
-            query,
-            {
-                "_id": False,
-                "url": False,
-                "hidden_id": False,
-                "message_id": False,
-                "posted_by": False,
-            },
-        ).sort([("code", pymongo.ASCENDING), ("level", pymongo.ASCENDING)]):
-            # Find if map_code for PB is in MapData to display map name and creator name.
-            if entry.code != cur_map:
-                cur_map = entry.code
-                map_data_connection = await MapData.find_one(
-                    {"code": entry.code},
-                    {"_id": False, "code": True, "map_name": True, "creator": True},
-                )
-                if map_data_connection:
-                    map_name = constants.PRETTY_NAMES[map_data_connection.map_name]
-                    creator = map_data_connection.creator
+        async def fetch(after, limit):
+            return await internal.pb_utils.personal_bests(query, after, limit)
+
+        def render(rows, page_number):
+            # natsort is only imported once someone views their pbs.
+            from natsort import natsorted
+
+            groups = []
+            for map_pbs in rows:
+                # Maps missing from MapData still show their PBs.
+                if map_pbs["map_name"] is not None:
+                    map_name = constants.PRETTY_NAMES[map_pbs["map_name"]]
+                    creator = map_pbs["creator"]
                 else:
                     map_name = "Needs Map"
                     creator = "Needs Author"
 
-            # Create a dict of all the indivudal map_codes and the PBs for each map_code
-            if embed_dict.get(str(entry.code), None) is None:
-                embed_dict[str(entry.code)] = {
-                    "title": f"{entry.code} - {map_name} by {creator}\n",
-                    "value": "",
-                }
-            embed_dict[str(entry.code)][
-                "value"
-            ] += f"> **Level: {entry.level}**\n> Record: {internal.pb_utils.display_record(entry.record)}\n> Verified: {constants.VERIFIED_EMOJI if entry.verified is True else constants.NOT_VERIFIED_EMOJI}\n━━━━━━━━━━━━\n"
-
-        embeds = []
-        embed = discord.Embed(title=name)
-
-        if len(embed_dict) > 0:
-            for i, map_pbs in enumerate(embed_dict.values()):
-                if len(map_pbs["value"]) > 1024:
-                    # if over 1024 char limit
-                    # split pbs dict value into list of individual pbs
-                    # and divide in half.. Add two fields instead of just one.
-                    delimiter_regex = r">.*\n>.*\n>.*\n━━━━━━━━━━━━\n"
-                    pb_split = re.findall(delimiter_regex, map_pbs["value"])
-                    pb_split = natsorted(pb_split)
-                    pb_split_1 = pb_split[: len(pb_split) // 2]
-                    pb_split_2 = pb_split[len(pb_split) // 2 :]
-                    embed.add_field(
-                        name=f"{map_pbs['title']} (1)",
-                        value="".join(pb_split_1),
-                        inline=False,
-                    )
-                    embed.add_field(
-                        name=f"{map_pbs['title']} (2)",
-                        value="".join(pb_split_2),
-                        inline=False,
-                    )
-                else:
-                    embed.add_field(
-                        name=map_pbs["title"], value=map_pbs["value"], inline=False
+                entries = natsorted(
+                    map_pbs["records"], key=lambda entry: entry["level"]
+                )
+                records = internal.pb_utils.display_records(
+                    entry["record"] for entry in entries
+                )
+                groups.append(
+                    (
+                        f"{map_pbs['code']} - {map_name} by {creator}",
+                        [
+                            f"> **Level: {entry['level']}**\n> Record: {record}\n> Verified: {constants.VERIFIED_EMOJI if entry['verified'] is True else constants.NOT_VERIFIED_EMOJI}\n━━━━━━━━━━━━\n"
+                            for entry, record in zip(entries, records)
+                        ],
                     )
-                if (i + 1) % 3 == 0 or (i + 1) == len(embed_dict):
-                    embeds.append(embed)
-                    embed = discord.Embed(title=name)
+                )
+            return embed_layout.pack(name, groups)
 
-        if embeds:
-            paginator = BotEmbedPaginator(ctx, embeds)
-            await paginator.run()
-        else:
+        paginator = LazyPaginator(
+            ctx, fetch, render, key=lambda row: row["code"], page_size=3
+        )
+        if not await paginator.run():
             await ctx.send(f"Nothing exists for {name}!")
 
     # view scoreboard
@@ -137,11 +95,7 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
         """Display top 10 verified/unverified records for a particular level."""
         map_code = map_code.upper()
         title = f"{map_code} - LEVEL {level.upper()} - TOP 10 VERIFIED/UNVERIFIED RECORDS:\n"
-        query = {
-            "code": map_code,
-            "level": re.compile(r"^" + re.escape(level) + r"$", re.IGNORECASE),
-        }
-        await boards(ctx, map_code, level, title, query)
+        await boards(ctx, map_code, level, title, verified_only=False)
 
     # view leaderboard
     @commands.command(
@@ -153,12 +107,7 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
         """Display top 10 verified records for a particular level."""
         map_code = map_code.upper()
         title = f"{map_code} - LEVEL {level.upper()} - TOP 10 VERIFIED RECORDS:\n"
-        query = {
-            "code": map_code,
-            "level": re.compile(r"^" + re.escape(level) + r"$", re.IGNORECASE),
-            "verified": True,
-        }
-        await boards(ctx, map_code, level.upper(), title, query)
+        await boards(ctx, map_code, level.upper(), title, verified_only=True)
 
     @commands.command(
         help="View world record(s) for a particular map code.\n[level] is an optional argument that will display a single level's world record.\nIf [level] is included, command will show only that level's world record.",
@@ -173,37 +122,19 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
         embed = None
         if level == "":
             title = f"{map_code} - VERIFIED WORLD RECORDS:\n"
-            level_checker = {}
             embed = discord.Embed(title=f"{title}")
-            async for entry in (
-                WorldRecords.find({"code": map_code, "verified": True})
-                .sort([("level", 1), ("record", 1)])
-                .collation(Collation(locale="en_US", numericOrdering=True))
-            ):
-                if entry.level.upper() not in level_checker.keys():
-                    level_checker[entry.level.upper()] = None
-                    exists = True
-                    embed.add_field(
-                        name=f"Level {entry.level.upper()} - {entry.name}",
-                        value=f"> Record: {internal.pb_utils.display_record(entry.record)}\n",
-                        inline=False,
-                    )
+            for entry in await wr_table.world_records(map_code):
+                exists = True
+                embed.add_field(
+                    name=f"Level {entry.level} - {entry.name}",
+                    value=f"> Record: {internal.pb_utils.display_record(entry.record)}\n",
+                    inline=False,
+                )
 
         else:
-            async for entry in (
-                WorldRecords.find(
-                    {
-                        "code": map_code,
-                        "level": re.compile(
-                            r"^" + re.escape(level) + r"$", re.IGNORECASE
-                        ),
-                        "verified": True,
-                    }
-                )
-                .sort("record", 1)
-                .limit(1)
-            ):
-                title = f"{map_code} - LEVEL {entry.level.upper()} - VERIFIED WORLD RECORD:\n"
+            entry = await wr_table.world_record(map_code, level_key(level))
+            if entry:
+                title = f"{map_code} - LEVEL {entry.level} - VERIFIED WORLD RECORD:\n"
                 exists = True
                 embed = discord.Embed(title=f"{title}")
                 embed.add_field(
@@ -230,23 +161,14 @@ class ViewPersonalBest(commands.Cog, name="Personal bests and leaderboards"):
         map_code = map_code.upper()
         title = f"{map_code} - LEVEL NAMES:\n"
 
-        level_checker = {}
-        async for entry in (
-            WorldRecords.find({"code": map_code})
-            .sort([("level", 1)])
-            .collation(Collation(locale="en_US", numericOrdering=True))
-            .limit(30)
-        ):
-            if entry.level.upper() not in level_checker.keys():
-                level_checker[entry.level.upper()] = None
-
-        if level_checker:
-            embed = discord.Embed(title=f"{title}")
-            embed.add_field(
-                name="Currenly submitted levels:", value=f"{', '.join(level_checker)}"
-            )
+        levels = await wr_table.levels(map_code)
 
-            await ctx.send(embed=embed)
+        if levels:
+            rows = [f"{level}, " for level in levels[:-1]] + [levels[-1]]
+            for embed in embed_layout.pack(
+                title, [("Currenly submitted levels:", rows)]
+            ):
+                await ctx.send(embed=embed)
 
         else:
             await ctx.send(f"No level names found for {map_code}!")
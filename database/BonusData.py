@@ -13,6 +13,7 @@ class BonusData(Document):
     attachment_url = StringField(required=True)
 
     class Meta:
-        """MongoDb database collection name."""
+        """MongoDb database collection name and indexes."""
 
         collection_name = "BonusData"
+        indexes = [("record", "_id")]
@@ -0,0 +1,20 @@
+from umongo import Document
+from umongo.fields import StringField, IntegerField, FloatField, ObjectIdField
+
+from internal.database_init import instance
+
+
+@instance.register
+class ExportCursor(Document):
+    """Progress of a screenshot export, so an interrupted export can resume."""
+
+    data_collection = StringField(required=True, unique=True)
+    channel_id = IntegerField(required=True)
+    record = FloatField()
+    last_id = ObjectIdField()
+    sent = IntegerField(default=0)
+
+    class Meta:
+        """MongoDb database collection name."""
+
+        collection_name = "ExportCursor"
@@ -0,0 +1,18 @@
+from umongo import Document
+from umongo.fields import IntegerField
+
+from internal.database_init import instance
+
+
+@instance.register
+class ExportedMessage(Document):
+    """A message posted by the screenshot exporter, so deletess can find it."""
+
+    message_id = IntegerField(required=True, unique=True)
+    channel_id = IntegerField(required=True)
+
+    class Meta:
+        """MongoDb database collection name and indexes."""
+
+        collection_name = "ExportedMessage"
+        indexes = ["channel_id"]
@@ -1,8 +1,18 @@
+import datetime
+import re
+
 from umongo import Document
-from umongo.fields import StringField, IntegerField, ListField
+from umongo.fields import StringField, IntegerField, ListField, DateTimeField
 
 from internal.database_init import instance
 
+_CREATOR_SEPARATORS = re.compile(r"[\s&,/+]+")
+
+
+def creator_tokens(creator):
+    """Split a creator string like "name1 & name2" into normalized names."""
+    return [token for token in _CREATOR_SEPARATORS.split(creator.casefold()) if token]
+
 
 @instance.register
 class MapData(Document):
@@ -10,12 +20,30 @@ class MapData(Document):
 
     code = StringField(required=True, unique=True)
     creator = StringField(required=True)
+    creator_tokens = ListField(StringField())
     map_name = StringField(required=True)
     posted_by = IntegerField(required=True)
     type = ListField(StringField(), required=True)
     desc = StringField()
+    created_at = DateTimeField()
+
+    def pre_insert(self):
+        """Store creator names and submission time with every new map."""
+        self.creator_tokens = creator_tokens(self.creator)
+        if self.created_at is None:
+            self.created_at = datetime.datetime.utcnow()
+
+    def pre_update(self):
+        """Keep the normalized creator names in sync on every update."""
+        self.creator_tokens = creator_tokens(self.creator)
 
     class Meta:
-        """MongoDb database collection name."""
+        """MongoDb database collection name and indexes."""
 
         collection_name = "MapData"
+        indexes = [
+            ("map_name", "code"),
+            "type",
+            "creator_tokens",
+            "created_at",
+        ]
@@ -13,6 +13,7 @@ class MildcoreData(Document):
     attachment_url = StringField(required=True)
 
     class Meta:
-        """MongoDb database collection name."""
+        """MongoDb database collection name and indexes."""
 
         collection_name = "MildcoreData"
+        indexes = [("record", "_id")]
@@ -13,6 +13,7 @@ class TimeAttackData(Document):
     attachment_url = StringField(required=True)
 
     class Meta:
-        """MongoDb database collection name."""
+        """MongoDb database collection name and indexes."""
 
         collection_name = "TimeAttackData"
+        indexes = [("record", "_id")]
@@ -4,6 +4,11 @@ from umongo.fields import StringField, FloatField, IntegerField, BooleanField
 from internal.database_init import instance
 
 
+def level_key(level):
+    """Canonical form of a level name used for exact lookups."""
+    return level.strip().upper()
+
+
 @instance.register
 class WorldRecords(Document):
     """WorldRecords database document."""
@@ -14,11 +19,25 @@ class WorldRecords(Document):
     message_id = IntegerField(required=True)
     url = StringField(required=True)
     level = StringField(required=True)
+    level_key = StringField()
     record = FloatField(required=True)
     verified = BooleanField(require=True)
     hidden_id = IntegerField(required=True)
 
+    def pre_insert(self):
+        """Store the canonical level name with every new record."""
+        self.level_key = level_key(self.level)
+
+    def pre_update(self):
+        """Keep the canonical level name in sync on every update."""
+        self.level_key = level_key(self.level)
+
     class Meta:
-        """MongoDb database collection name."""
+        """MongoDb database collection name and indexes."""
 
         collection_name = "WorldRecords"
+        indexes = [
+            ("code", "level_key", "record"),
+            "message_id",
+            "posted_by",
+        ]
@@ -0,0 +1,72 @@
+import time
+from collections import OrderedDict, namedtuple
+
+import internal.constants as constants
+from database.WorldRecords import WorldRecords
+
+BoardRow = namedtuple("BoardRow", ["id", "name", "record", "verified"])
+
+
+class BoardCache:
+    """LRU + TTL cache of the top BOARD_SIZE records per (code, level_key, verified_only).
+
+    Entries are invalidated through `invalidate` whenever a record on that
+    level is submitted, verified, rejected or deleted, so the TTL only
+    bounds staleness from writes made outside the bot.
+    """
+
+    def __init__(self):
+        self._boards = OrderedDict()
+        self._generations = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, code, level_key, verified_only):
+        """Return the top rows of a board, querying only on a miss."""
+        key = (code, level_key, verified_only)
+        cached = self._boards.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._boards.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        generation = self._generations.get((code, level_key), 0)
+        query = {"code": code, "level_key": level_key}
+        if verified_only:
+            query["verified"] = True
+        rows = [
+            BoardRow(
+                document["_id"],
+                document["name"],
+                document["record"],
+                document.get("verified"),
+            )
+            async for document in WorldRecords.collection.find(
+                query, {"name": True, "record": True, "verified": True}
+            )
+            .sort("record", 1)
+            .limit(constants.BOARD_SIZE)
+        ]
+
+        # Don't store a board that was invalidated while it was being read.
+        if self._generations.get((code, level_key), 0) == generation:
+            self._boards[key] = (
+                time.monotonic() + constants.BOARD_CACHE_TTL_SECONDS,
+                rows,
+            )
+            self._boards.move_to_end(key)
+            while len(self._boards) > constants.BOARD_CACHE_SIZE:
+                self._boards.popitem(last=False)
+        return rows
+
+    def invalidate(self, code, level_key):
+        """Drop both boards of a level."""
+        self._generations[(code, level_key)] = (
+            self._generations.get((code, level_key), 0) + 1
+        )
+        self._boards.pop((code, level_key, True), None)
+        self._boards.pop((code, level_key, False), None)
+
+
+board_cache = BoardCache()
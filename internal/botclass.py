@@ -1,56 +1,250 @@
 import asyncio
 import logging
+import sys
+import time
 from pathlib import Path
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
 import discord
 from discord.ext import commands
 from pretty_help import PrettyHelp
 
+from internal import members
+from internal.db_monitor import db_monitor
+from internal.metrics import (
+    CommandCall,
+    current_command,
+    instrument_http,
+    metrics,
+    serve,
+)
+from internal.outbound import outbound
+from internal.reactions import reactions
+
 # Logging setup
 logging.basicConfig(level=logging.INFO)
 
+# Extensions only needed for debugging, loaded after the bot is ready.
+DEFERRED_EXTENSIONS = ("debug",)
+
+# main.py imports this module first thing, so this is close to process start.
+STARTED = time.perf_counter()
+
+
+def max_rss_mb():
+    """Peak resident memory of the process in MB, or None if it isn't available."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes.
+    return max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def minimal_intents():
+    """Intents for commands, confirmations and verification, without members or presences."""
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.guild_messages = True
+    intents.guild_reactions = True
+    intents.dm_messages = True
+    intents.dm_reactions = True
+    return intents
+
+
+def cache_options(config):
+    """Intents and cache sizes for the configured intents mode, "minimal" or "all"."""
+    if config.get("intents", "all") == "minimal":
+        # Members are fetched on demand instead of chunked at connect.
+        return dict(
+            intents=minimal_intents(),
+            chunk_guilds_at_startup=False,
+            max_messages=config.get("max_messages", 250),
+        )
+    return dict(
+        intents=discord.Intents.all(),
+        max_messages=config.get("max_messages", 1000),
+    )
+
 
 class Bot(commands.Bot):
     """Discord Bot."""
 
     def __init__(self, **kwargs):
         """Initialize Bot."""
+        config = kwargs.pop("config", {})
+        self.intents_mode = config.get("intents", "all")
         super().__init__(
             command_prefix=commands.when_mentioned_or(*kwargs.pop("prefix")),
             description=kwargs.pop("description"),
-            intents=discord.Intents.all(),
             case_insensitive=kwargs.pop("case_insensitive"),
             help_command=PrettyHelp(show_index=False, color=discord.Color.purple()),
+            **cache_options(config),
         )
+        members.use_intents(self.intents)
         self.app_info = None
+        self.started = STARTED
+        self.first_command_served = None
+
+        instrument_http(self.http)
+        if config.get("metrics_port"):
+            self.loop.create_task(
+                serve(
+                    config.get("metrics_host", "127.0.0.1"),
+                    config["metrics_port"],
+                    self.gauges,
+                )
+            )
 
         self.loop.create_task(self.load_all_extensions())
 
+    def _load(self, extension, timings):
+        started = time.perf_counter()
+        try:
+            self.load_extension(f"cogs.{extension}")
+        except Exception as e:
+            error = f"{extension}\n {type(e).__name__} : {e}"
+            logging.info(f"failed to load extension {error}")
+        else:
+            timings[extension] = time.perf_counter() - started
+
     async def load_all_extensions(self):
-        """Load all *.py files in /cogs/ as Cogs."""
-        await self.wait_until_ready()
-        await asyncio.sleep(
-            1
-        )  # Ensure that on_ready has completed and finished printing
-        cogs = [x.stem for x in Path("cogs").glob("*.py")]
+        """Load all *.py files in /cogs/ as Cogs.
+
+        Runs while the bot logs in and connects to the gateway, yielding
+        between extensions so the connection can make progress. Extensions
+        in DEFERRED_EXTENSIONS are loaded once the bot is ready.
+        A timing report is logged for each phase.
+        """
+        cogs = sorted(
+            x.stem
+            for x in Path("cogs").glob("*.py")
+            if x.stem not in DEFERRED_EXTENSIONS
+        )
         logging.info("Loading extensions...\n")
+        timings = {}
         for extension in cogs:
-            try:
-                self.load_extension(f"cogs.{extension}")
-                logging.info(f"loaded {extension}")
-            except Exception as e:
-                error = f"{extension}\n {type(e).__name__} : {e}"
-                logging.info(f"failed to load extension {error}")
+            self._load(extension, timings)
+            await asyncio.sleep(0)
+        self._report("extensions", timings)
+
+        await self.wait_until_ready()
+        timings = {}
+        for extension in DEFERRED_EXTENSIONS:
+            self._load(extension, timings)
+        self._report("deferred extensions", timings)
+
+    def _report(self, phase, timings):
+        lines = "\n".join(
+            f"  {extension:<24}{seconds * 1000:8.1f} ms"
+            for extension, seconds in sorted(
+                timings.items(), key=lambda item: item[1], reverse=True
+            )
+        )
+        logging.info(
+            f"loaded {len(timings)} {phase} in {sum(timings.values()) * 1000:.1f} ms "
+            f"({time.perf_counter() - self.started:.2f}s after start)\n{lines}"
+        )
+
+    def gauges(self):
+        """Current state of the scheduler, reaction router, caches and database pool."""
+        # Documents can only be imported once the database instance exists.
+        from internal.board_cache import board_cache
+
+        pool = db_monitor.snapshot()
+        return [
+            (
+                "dfpk_outbound_calls",
+                "Discord calls made by the outbound scheduler.",
+                sum(outbound.calls.values()),
+            ),
+            (
+                "dfpk_outbound_coalesced",
+                "Discord calls saved by coalescing.",
+                sum(outbound.coalesced.values()),
+            ),
+            (
+                "dfpk_reaction_waiters",
+                "Menus waiting for a reaction.",
+                reactions.pending,
+            ),
+            (
+                "dfpk_board_cache_hits",
+                "Leaderboard lookups served from the board cache.",
+                board_cache.hits,
+            ),
+            (
+                "dfpk_board_cache_misses",
+                "Leaderboard lookups that queried the database.",
+                board_cache.misses,
+            ),
+            (
+                "dfpk_db_connections",
+                "Open database connections.",
+                pool["connections"],
+            ),
+            (
+                "dfpk_db_checked_out",
+                "Database connections in use.",
+                pool["checked_out"],
+            ),
+            (
+                "dfpk_db_waiting",
+                "Operations waiting for a database connection.",
+                pool["waiting"],
+            ),
+            (
+                "dfpk_gateway_latency_seconds",
+                "Discord gateway latency.",
+                self.latency,
+            ),
+        ]
+
+    async def invoke(self, ctx):
+        """Invoke a command while recording its latency and DB/HTTP calls."""
+        if ctx.command is None:
+            return await super().invoke(ctx)
+        call = CommandCall(ctx.command.qualified_name)
+        token = current_command.set(call)
+        started = time.perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            metrics.command_finished(
+                call, time.perf_counter() - started, ctx.command_failed
+            )
+            current_command.reset(token)
+
+    async def on_command_completion(self, ctx):
+        """Log the time from startup to the first command served."""
+        if self.first_command_served is None:
+            self.first_command_served = time.perf_counter() - self.started
+            logging.info(
+                f"first command served {self.first_command_served:.2f}s after start"
+            )
 
     async def on_ready(self):
         """Display app info when bot comes online."""
         self.app_info = await self.application_info()
+        max_rss = max_rss_mb()
+        max_rss = "unknown" if max_rss is None else f"{max_rss:.0f} MB"
         logging.info(
             f"\n\nLogged in as: {self.user.name}\n"
             f"Using discord.py version: {discord.__version__}\n"
-            f"Owner: {self.app_info.owner}\n\n"
+            f"Owner: {self.app_info.owner}\n"
+            f"Intents: {self.intents_mode}, ready {time.perf_counter() - self.started:.2f}s "
+            f"after start, max RSS {max_rss}\n\n"
         )
 
+    async def on_raw_reaction_add(self, payload):
+        """Route reactions to waiting menus and inform the outbound scheduler."""
+        if payload.user_id != self.user.id:
+            outbound.reaction_added(payload.message_id)
+            reactions.dispatch(payload)
+
     async def on_message(self, message):
         """Allow bot to ignore all other bots."""
         if message.author.bot:
@@ -4,6 +4,8 @@ import sys
 import discord
 from discord.ext import commands
 import internal.constants as constants
+from internal.outbound import outbound
+from internal.reactions import reactions
 
 
 async def confirm(ctx: commands.Context, message: discord.Message):
@@ -13,28 +15,26 @@ async def confirm(ctx: commands.Context, message: discord.Message):
     If a timeout occurs, return None.
     """
 
-    def check(r, u):
-        """Check if reaction is from command author."""
-        return (
-            str(r.emoji)
-            in (constants.CONFIRM_REACTION_EMOJI, constants.CANCEL_REACTION_EMOJI)
-            and u.id == ctx.author.id
-            and r.message.id == message.id
-        )
-
-    await message.add_reaction(constants.CONFIRM_REACTION_EMOJI)
-    await message.add_reaction(constants.CANCEL_REACTION_EMOJI)
+    # Start listening while the reactions are still being added.
+    outbound.add_reactions(
+        message, constants.CONFIRM_REACTION_EMOJI, constants.CANCEL_REACTION_EMOJI
+    )
 
     try:
-        reaction, user = await ctx.bot.wait_for("reaction_add", timeout=30, check=check)
+        reaction = await reactions.wait(
+            message.id,
+            ctx.author.id,
+            (constants.CONFIRM_REACTION_EMOJI, constants.CANCEL_REACTION_EMOJI),
+            timeout=30,
+        )
 
         emoji = str(reaction.emoji)
 
         if emoji == constants.CONFIRM_REACTION_EMOJI:
-            await message.clear_reactions()
+            outbound.clear_reactions(message)
             return True
-        await message.clear_reactions()
+        outbound.clear_reactions(message)
         return False
     except asyncio.TimeoutError:
-        await message.clear_reactions()
+        outbound.clear_reactions(message)
         return None
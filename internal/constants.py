@@ -159,3 +159,23 @@ PRETTY_NAMES = {
     "practicerange": "Practice Range",
     "framework": "Framework",
 }
+
+# seconds between full reloads of the in-memory map catalog
+MAP_CATALOG_REFRESH_SECONDS = 900
+
+# leaderboard/scoreboard cache
+BOARD_SIZE = 10
+BOARD_CACHE_SIZE = 256
+BOARD_CACHE_TTL_SECONDS = 300
+
+# rendered map search pages kept in memory, keyed by query
+MAP_RENDER_CACHE_SIZE = 128
+
+# tournament screenshot export
+EXPORT_EMBEDS_PER_MESSAGE = 10
+EXPORT_WEBHOOK_NAME = "Screenshot Export"
+EXPORT_WEBHOOKS = 2
+EXPORT_CONCURRENCY = 2
+# Discord only bulk deletes up to 100 messages younger than 14 days.
+BULK_DELETE_LIMIT = 100
+BULK_DELETE_MAX_AGE_DAYS = 14
@@ -0,0 +1,11 @@
+"""Constants for the current mode.
+
+Re-exports constants_bot_test when the bot is started with the 'test' arg,
+constants_bot_prod otherwise, so sys.argv is only checked once.
+"""
+import sys
+
+if len(sys.argv) > 1 and sys.argv[1] == "test":
+    from internal.constants_bot_test import *  # noqa: F401,F403
+else:
+    from internal.constants_bot_prod import *  # noqa: F401,F403
@@ -1,14 +1,162 @@
+import importlib
+import logging
+from pathlib import Path
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
 from umongo import Instance
 
+from internal.db_monitor import db_monitor
+from internal.slow_queries import _find_key, slow_query_log
+
 
 instance = None
+db = None
+
+# Representative queries issued by commands and caches.
+# (label, collection name, filter or aggregation pipeline, sort)
+# An empty filter is a deliberate full read, e.g. loading a cache.
+COMMAND_QUERIES = [
+    (
+        "submitpb",
+        "WorldRecords",
+        {"code": "", "level_key": "", "posted_by": 0},
+        None,
+    ),
+    (
+        "deletepb",
+        "WorldRecords",
+        {"code": "", "level_key": "", "$or": [{"posted_by": 0}, {"name": ""}]},
+        None,
+    ),
+    (
+        "board cache/world record recompute",
+        "WorldRecords",
+        {"code": "", "level_key": "", "verified": True},
+        [("record", 1)],
+    ),
+    (
+        "world record table load",
+        "WorldRecords",
+        [
+            {"$match": {}},
+            {"$sort": {"code": 1, "level_key": 1, "verified": -1, "record": 1}},
+            {
+                "$group": {
+                    "_id": {"code": "$code", "level_key": "$level_key"},
+                    "record": {"$first": "$record"},
+                }
+            },
+        ],
+        None,
+    ),
+    (
+        "pb",
+        "WorldRecords",
+        [
+            {"$match": {"posted_by": 0}},
+            {"$sort": {"code": 1, "level": 1}},
+            {"$group": {"_id": "$code", "records": {"$push": "$record"}}},
+        ],
+        None,
+    ),
+    ("verification", "WorldRecords", {"message_id": 0}, None),
+    ("message index load", "WorldRecords", {}, None),
+    ("submitmap/editmap", "MapData", {"code": ""}, None),
+    ("map catalog load", "MapData", {}, [("created_at", 1)]),
+    ("tournament boards", "TimeAttackData", {}, [("record", 1), ("_id", 1)]),
+]
+
+
+def init(dburl, dbname, **client_options):
+    """Initialize a database instance.
+
+    client_options are passed to AsyncIOMotorClient, e.g. maxPoolSize or
+    serverSelectionTimeoutMS. Pool and command metrics are collected by
+    db_monitor, slow operations by slow_query_log.
+    """
+    global instance, db
+
+    client = AsyncIOMotorClient(
+        dburl, event_listeners=[db_monitor, slow_query_log], **client_options
+    )
+    db = client[dbname]
+
+    instance = Instance(db)
+
+
+def load_documents():
+    """Import all *.py files in /database/ and return their Documents.
+
+    Each module defines a Document with the same name as the module.
+    """
+    documents = []
+    for path in sorted(Path("database").glob("*.py")):
+        module = importlib.import_module(f"database.{path.stem}")
+        document = getattr(module, path.stem, None)
+        if document is not None:
+            documents.append(document)
+    return documents
+
+
+async def ensure_indexes():
+    """Create or verify the indexes declared in each Document's Meta."""
+    for document in load_documents():
+        try:
+            await document.ensure_indexes()
+            logging.info(f"indexes ok for {document.__name__}")
+        except OperationFailure as e:
+            logging.warning(f"failed to create indexes for {document.__name__}: {e}")
+
 
+def plan_stages(plan):
+    """Flatten a winning plan into a list of (stage, index name)."""
+    stages = [(plan.get("stage"), plan.get("indexName"))]
+    if "inputStage" in plan:
+        stages += plan_stages(plan["inputStage"])
+    for stage in plan.get("inputStages", []):
+        stages += plan_stages(stage)
+    return stages
 
-def init(dburl, dbname):
-    """Initialize a database instance."""
-    global instance
 
-    client = AsyncIOMotorClient(dburl)
+async def explain_report():
+    """Log which command queries are served by an index and which scan."""
+    logging.info("Query plan report:")
+    for label, collection_name, query, sort in COMMAND_QUERIES:
+        try:
+            if isinstance(query, list):
+                explain = await db.command(
+                    {
+                        "explain": {
+                            "aggregate": collection_name,
+                            "pipeline": query,
+                            "cursor": {},
+                        },
+                        "verbosity": "queryPlanner",
+                    }
+                )
+                full_read = not query[0]["$match"]
+            else:
+                cursor = db[collection_name].find(query)
+                if sort:
+                    cursor = cursor.sort(sort)
+                explain = await cursor.explain()
+                full_read = not query
+        except OperationFailure as e:
+            logging.warning(f"{label}: explain failed: {e}")
+            continue
 
-    instance = Instance(client[dbname])
+        plan = _find_key(explain, "winningPlan")
+        if plan is None:
+            logging.warning(f"{label} ({collection_name}): no query plan")
+            continue
+        # Plans run by the slot-based engine nest the classic plan.
+        stages = plan_stages(plan.get("queryPlan", plan))
+        indexes = [index for _, index in stages if index]
+        if any(stage == "COLLSCAN" for stage, _ in stages):
+            if full_read:
+                logging.info(f"{label} ({collection_name}): full read")
+            else:
+                logging.warning(f"{label} ({collection_name}): COLLSCAN")
+        else:
+            logging.info(f"{label} ({collection_name}): {', '.join(indexes)}")
@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from pymongo import monitoring
+from pymongo.common import MAX_POOL_SIZE
+
+from internal.metrics import metrics
+
+# Seconds between two "pool saturated" warnings.
+SATURATION_WARNING_INTERVAL = 60
+
+
+class _CommandStats:
+    __slots__ = ("count", "failures", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class DatabaseMonitor(monitoring.ConnectionPoolListener, monitoring.CommandListener):
+    """Connection pool and command metrics for the Motor client.
+
+    Counts are summed over the pools of every server the client talks to.
+    Pymongo calls listeners from Motor's worker threads, so every update
+    is made under a lock. `snapshot` returns a consistent copy.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.max_pool_size = None
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.check_out_failures = defaultdict(int)
+        self.connections = 0
+        self.commands = defaultdict(_CommandStats)
+        self._last_warning = 0.0
+
+    # Connection pool events
+
+    def pool_created(self, event):
+        self.max_pool_size = event.options.get("maxPoolSize", MAX_POOL_SIZE)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections -= 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            saturated = (
+                self.max_pool_size is not None
+                and self.checked_out >= self.max_pool_size
+            )
+        if saturated:
+            self._warn_saturated()
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.check_out_failures[event.reason] += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def _warn_saturated(self):
+        now = time.monotonic()
+        if now - self._last_warning < SATURATION_WARNING_INTERVAL:
+            return
+        self._last_warning = now
+        logging.warning(
+            f"mongo pool saturated: {self.checked_out}/{self.max_pool_size} "
+            f"connections in use, {self.waiting} operations waiting"
+        )
+
+    # Command events
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event.command_name, event.duration_micros, failed=False)
+
+    def failed(self, event):
+        self._record(event.command_name, event.duration_micros, failed=True)
+
+    def _record(self, command_name, duration_micros, failed):
+        seconds = duration_micros / 1_000_000
+        with self._lock:
+            stats = self.commands[command_name]
+            stats.count += 1
+            stats.failures += failed
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+        metrics.db_call(seconds)
+
+    def snapshot(self):
+        """Return the current metrics as plain dicts."""
+        with self._lock:
+            return {
+                "max_pool_size": self.max_pool_size,
+                "connections": self.connections,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "check_out_failures": dict(self.check_out_failures),
+                "commands": {
+                    name: {
+                        "count": stats.count,
+                        "failures": stats.failures,
+                        "mean_ms": stats.total / stats.count * 1000,
+                        "max_ms": stats.max * 1000,
+                    }
+                    for name, stats in self.commands.items()
+                    if stats.count
+                },
+            }
+
+
+db_monitor = DatabaseMonitor()
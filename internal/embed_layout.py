@@ -0,0 +1,76 @@
+import discord
+
+# Discord embed limits
+TITLE_LIMIT = 256
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+FIELD_COUNT_LIMIT = 25
+EMBED_TOTAL_LIMIT = 6000
+
+# Room left in every embed for a footer such as "Page 10/12".
+FOOTER_RESERVE = 64
+
+
+def truncate(text, limit):
+    """Shorten text to at most limit characters."""
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def pack(title, groups, max_fields=FIELD_COUNT_LIMIT):
+    """Pack groups of rows into as few embeds as Discord allows.
+
+    Each group becomes one field. Rows are never split; when a group's rows
+    don't fit in one field value, the group continues in fields named
+    "<name> (cont.)". An embed is closed when adding a field would pass
+    max_fields, FIELD_COUNT_LIMIT or EMBED_TOTAL_LIMIT.
+
+    Args:
+        title (str): Title of every embed
+        groups (iterable): (field name, list of row strings) pairs
+        max_fields (int, optional): Maximum fields per embed
+
+    Returns:
+        list: discord.Embed objects, empty if there were no rows
+
+    """
+    title = truncate(title or "", TITLE_LIMIT)
+    max_fields = min(max_fields, FIELD_COUNT_LIMIT)
+    budget = EMBED_TOTAL_LIMIT - FOOTER_RESERVE - len(title)
+    embeds = []
+    fields = []
+    size = 0
+
+    def add_field(name, value):
+        nonlocal fields, size
+        if fields and (
+            len(fields) == max_fields or size + len(name) + len(value) > budget
+        ):
+            embeds.append(fields)
+            fields, size = [], 0
+        fields.append((name, value))
+        size += len(name) + len(value)
+
+    for name, rows in groups:
+        name = truncate(name, FIELD_NAME_LIMIT)
+        field_name = name
+        value = ""
+        for row in rows:
+            row = truncate(row, FIELD_VALUE_LIMIT)
+            if value and len(value) + len(row) > FIELD_VALUE_LIMIT:
+                add_field(field_name, value)
+                field_name = truncate(f"{name} (cont.)", FIELD_NAME_LIMIT)
+                value = ""
+            value += row
+        if value:
+            add_field(field_name, value)
+
+    if fields:
+        embeds.append(fields)
+
+    result = []
+    for page in embeds:
+        embed = discord.Embed(title=title) if title else discord.Embed()
+        for name, value in page:
+            embed.add_field(name=name, value=value, inline=False)
+        result.append(embed)
+    return result
@@ -0,0 +1,350 @@
+import asyncio
+import bisect
+import logging
+import re
+from collections import namedtuple
+
+import internal.constants as constants
+from database.MapData import MapData, creator_tokens
+
+MapEntry = namedtuple(
+    "MapEntry",
+    [
+        "id",
+        "code",
+        "map_name",
+        "creator",
+        "creator_tokens",
+        "creator_names",
+        "type",
+        "desc",
+        "posted_by",
+        "created_at",
+    ],
+)
+
+# Fields with a secondary index.
+_INDEXED_FIELDS = (
+    "code",
+    "map_name",
+    "creator",
+    "creator_tokens",
+    "creator_names",
+    "type",
+)
+
+# Separators between creators in a creator string; whitespace is kept,
+# so names with spaces like "some guy" stay whole.
+_NAME_SEPARATORS = re.compile(r"[&,/+]+")
+
+# Length of the substrings indexed for partial creator search.
+_NGRAM_SIZE = 3
+
+
+def _normalize(name):
+    """Casefold a name and collapse its whitespace."""
+    return " ".join(name.casefold().split())
+
+
+def _creator_names(creator):
+    """Split a creator string like "some guy & name2" into normalized names."""
+    return tuple(
+        name for name in map(_normalize, _NAME_SEPARATORS.split(creator)) if name
+    )
+
+
+def _ngrams(text):
+    """Return the set of _NGRAM_SIZE long substrings of text."""
+    return {text[i : i + _NGRAM_SIZE] for i in range(len(text) - _NGRAM_SIZE + 1)}
+
+
+def _entry(document):
+    """Build a compact MapEntry from a MapData document or raw dict."""
+    if isinstance(document, dict):
+        get = document.get
+        return MapEntry(
+            get("_id"),
+            get("code"),
+            get("map_name"),
+            get("creator"),
+            tuple(get("creator_tokens") or creator_tokens(get("creator") or "")),
+            _creator_names(get("creator") or ""),
+            tuple(get("type") or ()),
+            get("desc"),
+            get("posted_by"),
+            _naive(get("created_at") or get("_id").generation_time),
+        )
+    return MapEntry(
+        document.pk,
+        document.code,
+        document.map_name,
+        document.creator,
+        tuple(creator_tokens(document.creator)),
+        _creator_names(document.creator),
+        tuple(document.type or ()),
+        document.desc,
+        document.posted_by,
+        _naive(document.created_at or document.pk.generation_time),
+    )
+
+
+def _naive(created_at):
+    """Drop tzinfo so ObjectId timestamps compare with stored UTC datetimes."""
+    return created_at.replace(tzinfo=None)
+
+
+def _matches(entry, field, value):
+    """Check a single query condition against an entry."""
+    actual = getattr(entry, field)
+    if isinstance(actual, tuple):
+        return value in actual
+    return actual == value
+
+
+class MapCatalog:
+    """Read-through in-memory copy of MapData.
+
+    Holds every map as a MapEntry with secondary indexes by code,
+    map_name, creator, creator name, type and submission time.
+    SubmitMap writes through with upsert/remove, and the whole catalog
+    is reloaded every MAP_CATALOG_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._indexes = {field: {} for field in _INDEXED_FIELDS}
+        self._sorted_tokens = None
+        self._sorted_names = None
+        # n-gram -> creator strings containing it, for partial creator search.
+        self._creator_grams = {}
+        self._recency = []
+        self._lock = asyncio.Lock()
+        self._refresher = None
+        # Writes made while a load is reading MapData, replayed after it.
+        self._pending = None
+        self.loaded = False
+        # Bumped on every change, so rendered results can tell they are stale.
+        self.version = 0
+
+    async def ensure_loaded(self):
+        """Load the catalog on first use and start the periodic refresh."""
+        if self.loaded:
+            return
+        async with self._lock:
+            if self.loaded:
+                return
+            await self._load()
+            self.loaded = True
+            self._refresher = asyncio.get_event_loop().create_task(
+                self._refresh_periodically()
+            )
+
+    async def _load(self):
+        """Replace the catalog with the current contents of MapData."""
+        self._pending = []
+        try:
+            documents = (
+                await MapData.collection.find()
+                .sort("created_at", 1)
+                .to_list(length=None)
+            )
+        finally:
+            pending, self._pending = self._pending, None
+        # Rebuild without awaiting so readers never see a partial catalog.
+        old_entries = self._entries
+        self._entries = {}
+        self._indexes = {field: {} for field in _INDEXED_FIELDS}
+        self._creator_grams = {}
+        self._recency = []
+        for document in documents:
+            self._add(_entry(document))
+        # The read may have missed writes committed while it ran.
+        for write, document in pending:
+            write(document)
+        # Only a real change invalidates rendered results.
+        if self._entries != old_entries:
+            self.version += 1
+        logging.info(f"map catalog loaded {len(self._entries)} maps")
+
+    async def _refresh_periodically(self):
+        while True:
+            await asyncio.sleep(constants.MAP_CATALOG_REFRESH_SECONDS)
+            try:
+                await self._load()
+            except Exception as e:
+                logging.warning(f"map catalog refresh failed: {e}")
+
+    def _index_keys(self, entry, field):
+        value = getattr(entry, field)
+        return value if isinstance(value, tuple) else (value,)
+
+    def _index(self, entry):
+        self._sorted_tokens = None
+        self._sorted_names = None
+        bisect.insort(self._recency, (entry.created_at, entry.id))
+        if entry.creator is not None and entry.creator not in self._indexes["creator"]:
+            for gram in _ngrams(_normalize(entry.creator)):
+                self._creator_grams.setdefault(gram, set()).add(entry.creator)
+        for field, index in self._indexes.items():
+            for key in self._index_keys(entry, field):
+                index.setdefault(key, {})[entry.id] = entry
+
+    def _unindex(self, entry):
+        self._sorted_tokens = None
+        self._sorted_names = None
+        position = bisect.bisect_left(self._recency, (entry.created_at, entry.id))
+        if self._recency[position : position + 1] == [(entry.created_at, entry.id)]:
+            del self._recency[position]
+        for field, index in self._indexes.items():
+            for key in self._index_keys(entry, field):
+                bucket = index.get(key)
+                if bucket is not None:
+                    bucket.pop(entry.id, None)
+                    if not bucket:
+                        del index[key]
+        if entry.creator is not None and entry.creator not in self._indexes["creator"]:
+            for gram in _ngrams(_normalize(entry.creator)):
+                creators = self._creator_grams.get(gram)
+                if creators is not None:
+                    creators.discard(entry.creator)
+                    if not creators:
+                        del self._creator_grams[gram]
+
+    def _add(self, entry):
+        self._entries[entry.id] = entry
+        self._index(entry)
+
+    def _upsert(self, document):
+        entry = _entry(document)
+        old = self._entries.get(entry.id)
+        if old is not None:
+            self._unindex(old)
+        self._add(entry)
+
+    def _remove(self, document):
+        entry = self._entries.pop(document.pk, None)
+        if entry is not None:
+            self._unindex(entry)
+        return entry is not None
+
+    def upsert(self, document):
+        """Write through a committed MapData document."""
+        if self._pending is not None:
+            self._pending.append((self._upsert, document))
+        self._upsert(document)
+        self.version += 1
+
+    def remove(self, document):
+        """Write through a deleted MapData document."""
+        if self._pending is not None:
+            self._pending.append((self._remove, document))
+        if self._remove(document):
+            self.version += 1
+
+    def _candidates(self, query):
+        """Return the smallest indexed candidate set for a query."""
+        best = None
+        for field in _INDEXED_FIELDS:
+            value = query.get(field)
+            if value is None:
+                continue
+            bucket = self._indexes[field].get(value, {})
+            if best is None or len(bucket) < len(best):
+                best = bucket
+        return (best if best is not None else self._entries).values()
+
+    def _find(self, query):
+        if "$or" in query:
+            found = {}
+            for sub_query in query["$or"]:
+                for entry in self._find(sub_query):
+                    found[entry.id] = entry
+            return list(found.values())
+        return [
+            entry
+            for entry in self._candidates(query)
+            if all(_matches(entry, field, value) for field, value in query.items())
+        ]
+
+    async def find(self, query):
+        """Find maps matching a MapData-style query, sorted by map_name.
+
+        Supports equality on indexed fields and $or of those.
+        """
+        await self.ensure_loaded()
+        return sorted(self._find(query), key=lambda entry: entry.map_name)
+
+    async def search_creator(self, creator):
+        """Find maps by creator name, ranked by how well the name matches.
+
+        Maps with a creator name or word equal to the search come first,
+        then names or words starting with it, then creators containing it
+        anywhere. Each group is sorted by map_name. Creators containing the
+        search are found through an n-gram index, so searches shorter than
+        three characters only match whole names and prefixes.
+        """
+        await self.ensure_loaded()
+        search = _normalize(creator)
+        if not search:
+            return []
+        token_index = self._indexes["creator_tokens"]
+        name_index = self._indexes["creator_names"]
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(token_index)
+        if self._sorted_names is None:
+            self._sorted_names = sorted(name_index)
+
+        exact = {**token_index.get(search, {}), **name_index.get(search, {})}
+        prefix = {}
+        for index, keys in (
+            (token_index, self._sorted_tokens),
+            (name_index, self._sorted_names),
+        ):
+            position = bisect.bisect_left(keys, search)
+            while position < len(keys) and keys[position].startswith(search):
+                prefix.update(index[keys[position]])
+                position += 1
+        partial = {}
+        grams = sorted(
+            (self._creator_grams.get(gram, set()) for gram in _ngrams(search)),
+            key=len,
+        )
+        if grams:
+            for name in grams[0].intersection(*grams[1:]):
+                if search in _normalize(name):
+                    partial.update(self._indexes["creator"][name])
+
+        ranked = {}
+        for group in (exact, prefix, partial):
+            for entry in sorted(group.values(), key=lambda entry: entry.map_name):
+                ranked.setdefault(entry.id, entry)
+        return list(ranked.values())
+
+    async def newest(self, limit, map_type="", before=None):
+        """Return up to `limit` maps, newest first.
+
+        Args:
+            limit (int): Amount of maps to return
+            map_type (str, optional): Only return maps of this type
+            before (MapEntry, optional): Only return maps older than this one,
+                for paging through older maps
+
+        Returns:
+            list: MapEntry objects
+
+        """
+        await self.ensure_loaded()
+        end = len(self._recency)
+        if before is not None:
+            end = bisect.bisect_left(self._recency, (before.created_at, before.id))
+        entries = []
+        for position in range(end - 1, -1, -1):
+            entry = self._entries[self._recency[position][1]]
+            if not map_type or map_type in entry.type:
+                entries.append(entry)
+                if len(entries) == limit:
+                    break
+        return entries
+
+
+map_catalog = MapCatalog()
@@ -0,0 +1,41 @@
+from collections import OrderedDict, namedtuple
+
+import internal.constants as constants
+
+RenderedQuery = namedtuple("RenderedQuery", ["version", "entries", "pages"])
+
+
+class MapRenderCache:
+    """LRU cache of map search results and their rendered embed pages.
+
+    Each entry is tagged with the map catalog version it was built from.
+    The catalog bumps its version on every SubmitMap write and reload, so a
+    stale entry is simply never returned again.
+    """
+
+    def __init__(self):
+        self._queries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        """Return the cached result for key if it was built from version."""
+        cached = self._queries.get(key)
+        if cached is not None and cached.version == version:
+            self._queries.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        return None
+
+    def put(self, key, version, entries):
+        """Store the entries of a query. Pages are filled in as they render."""
+        cached = RenderedQuery(version, entries, {})
+        self._queries[key] = cached
+        self._queries.move_to_end(key)
+        while len(self._queries) > constants.MAP_RENDER_CACHE_SIZE:
+            self._queries.popitem(last=False)
+        return cached
+
+
+map_render_cache = MapRenderCache()
@@ -1,17 +1,11 @@
-import sys
-
 import discord
-import pymongo
-from disputils import BotEmbedPaginator
 
 import internal.constants as constants
-from database.MapData import MapData
-
-if len(sys.argv) > 1:
-    if sys.argv[1] == "test":
-        from internal import constants_bot_test as constants_bot
-else:
-    from internal import constants_bot_prod as constants_bot
+from internal import constants_bot, embed_layout
+from internal.map_catalog import map_catalog
+from internal.map_render_cache import map_render_cache
+from internal.outbound import outbound
+from internal.paginator import LazyPaginator
 
 
 async def searchmap(
@@ -39,47 +33,61 @@ async def searchmap(
             )
             return
 
-    # init vars
-    row, embeds = 0, []
+    title = map_name or creator or map_code or map_type
+    key = (repr(sorted(query.items())), title)
+    # Load first so the initial load cannot change the version read below.
+    await map_catalog.ensure_loaded()
+    # Take the version before reading so a concurrent write can only cause a miss.
+    version = map_catalog.version
+    cached = map_render_cache.get(key, version)
+    if cached is None:
+        cached = map_render_cache.put(key, version, await map_catalog.find(query))
+    await display_maps(ctx, cached.entries, title, cached.pages)
 
-    embed = discord.Embed(title=map_name or creator or map_code or map_type)
-    count = await MapData.count_documents(query)
 
-    async for entry in MapData.find(query).sort([("map_name", pymongo.ASCENDING)]):
+async def display_maps(ctx, entries, title, pages=None):
+    """Display map entries as paginated embeds.
 
-        # Every 10th embed field, create a embed obj and add to a list
-        if row != 0 and (row % 10 == 0 or count - 1 == row):
+    Pages are rendered only when they are viewed.
 
-            embed.add_field(
-                name=f"{entry.code} - {constants.PRETTY_NAMES[entry.map_name]}",
-                value=f"> Creator: {entry.creator}\n> Map Types: {', '.join(entry.type)}\n> Description: {entry.desc}",
-                inline=False,
-            )
-            embeds.append(embed)
-            embed = discord.Embed(title=map_name or creator or map_code or map_type)
-
-        # Create embed fields for fields 1 thru 9
-        elif row % 10 != 0 or row == 0:
-            embed.add_field(
-                name=f"{entry.code} - {constants.PRETTY_NAMES[entry.map_name]}",
-                value=f"> Creator: {entry.creator}\n> Map Types: {', '.join(entry.type)}\n> Description: {entry.desc}",
-                inline=False,
-            )
+    Args:
+        ctx (:obj: `commands.Context`)
+        entries (list): MapEntry objects to display, in order
+        title (str): Embed title
+        pages (dict, optional): Rendered pages by chunk number, reused and filled in
 
-        # If only one page
-        if count == 1:
-            embeds.append(embed)
-        row += 1
+    Returns:
+        None
 
-    # Displays paginated embeds
-    if row:
-        paginator = BotEmbedPaginator(ctx, embeds)
-        await paginator.run()
+    """
 
-    else:
-        await ctx.send(
-            f"Nothing exists for {map_name or creator or map_code or map_type}!"
+    async def fetch(after, limit):
+        start = 0 if after is None else after + 1
+        return list(enumerate(entries[start : start + limit], start))
+
+    def render(rows, page_number):
+        if pages is not None and page_number in pages:
+            return pages[page_number]
+        embeds = embed_layout.pack(
+            title,
+            (
+                (
+                    f"{entry.code} - {constants.PRETTY_NAMES[entry.map_name]}",
+                    [
+                        f"> Creator: {entry.creator}\n> Map Types: {', '.join(entry.type)}\n> Description: {entry.desc}"
+                    ],
+                )
+                for _, entry in rows
+            ),
+            max_fields=10,
         )
+        if pages is not None:
+            pages[page_number] = embeds
+        return embeds
+
+    paginator = LazyPaginator(ctx, fetch, render, key=lambda row: row[0])
+    if not await paginator.run():
+        await ctx.send(f"Nothing exists for {title}!")
 
 
 def normal_map_query(map_name, map_type=""):
@@ -121,15 +129,17 @@ async def map_submit_embed(document, title):
 
 async def map_edit_confirmation(confirmed, msg, document):
     if confirmed is True:
-        await msg.edit(content=f"{document.code} has been edited.")
+        outbound.edit(msg, content=f"{document.code} has been edited.")
         await document.commit()
+        map_catalog.upsert(document)
     elif confirmed is False:
-        await msg.edit(content=f"{document.code} has not been edited.")
+        outbound.edit(msg, content=f"{document.code} has not been edited.")
     elif confirmed is None:
-        await msg.edit(
-            content=f"Submission timed out! {document.code} has not been edited."
+        outbound.edit(
+            msg, content=f"Submission timed out! {document.code} has not been edited."
         )
-    await msg.clear_reactions()
+    # Usually already cleared by confirm, in which case this costs nothing.
+    outbound.clear_reactions(msg)
 
 
 async def map_edit_checks(ctx, map_code, search) -> int:
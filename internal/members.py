@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+import discord
+
+# Gateway member queries accept at most 100 user ids.
+QUERY_BATCH_SIZE = 100
+
+# Without the members intent, members are fetched over REST and kept here.
+FETCH_CONCURRENCY = 5
+FETCHED_MEMBERS = 1024
+FETCHED_MEMBER_TTL_SECONDS = 600
+# Users that aren't in the guild are remembered for a shorter time.
+MISSING_MEMBER_TTL_SECONDS = 60
+
+# (guild id, user id) -> (expires, member or None if the user isn't in the guild)
+_fetched = OrderedDict()
+
+# Set from the bot's intents by use_intents.
+_members_intent = True
+
+
+def use_intents(intents):
+    """Look members up the way the bot's gateway intents allow."""
+    global _members_intent
+    _members_intent = intents.members
+
+
+def _remember(guild, user_id, member):
+    ttl = FETCHED_MEMBER_TTL_SECONDS if member else MISSING_MEMBER_TTL_SECONDS
+    _fetched[(guild.id, user_id)] = (time.monotonic() + ttl, member)
+    _fetched.move_to_end((guild.id, user_id))
+    while len(_fetched) > FETCHED_MEMBERS:
+        _fetched.popitem(last=False)
+
+
+async def _fetch_members(guild, user_ids):
+    """Fetch members one by one over REST, a few at a time."""
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def fetch(user_id):
+        async with semaphore:
+            try:
+                member = await guild.fetch_member(user_id)
+            except discord.NotFound:
+                member = None
+            except (discord.HTTPException, asyncio.TimeoutError) as e:
+                logging.warning(f"fetching member {user_id} failed: {e}")
+                return None
+            _remember(guild, user_id, member)
+            return member
+
+    return [
+        member
+        for member in await asyncio.gather(*(fetch(user_id) for user_id in user_ids))
+        if member is not None
+    ]
+
+
+def _cached_member(guild, user_id):
+    """Return (known, member). known is False if user_id has to be looked up."""
+    member = guild.get_member(user_id)
+    if member is not None:
+        return True, member
+    cached = _fetched.get((guild.id, user_id))
+    if cached is not None and cached[0] > time.monotonic():
+        return True, cached[1]
+    return False, None
+
+
+async def resolve_members(guild, user_ids):
+    """Map user ids to members of guild.
+
+    Members are looked up by id in the guild's member cache. Ids missing
+    from the cache are requested in batches over the gateway and cached.
+    When the bot runs without the members intent they are fetched over
+    REST instead and kept for FETCHED_MEMBER_TTL_SECONDS. Users that
+    aren't in the guild are remembered for MISSING_MEMBER_TTL_SECONDS.
+    Failed lookups are logged and leave the user unresolved.
+
+    Args:
+        guild (:obj: `discord.Guild`)
+        user_ids (iterable): User ids to resolve, duplicates are fine
+
+    Returns:
+        dict: user id -> discord.Member, or None if the user isn't in guild
+
+    """
+    members = {}
+    missing = []
+    for user_id in dict.fromkeys(user_ids):
+        known, members[user_id] = _cached_member(guild, user_id)
+        if not known:
+            missing.append(user_id)
+
+    if not _members_intent:
+        # Gateway member queries need the members intent.
+        for member in await _fetch_members(guild, missing):
+            members[member.id] = member
+        return members
+
+    for start in range(0, len(missing), QUERY_BATCH_SIZE):
+        batch = missing[start : start + QUERY_BATCH_SIZE]
+        try:
+            found = await guild.query_members(
+                user_ids=batch, limit=len(batch), cache=True
+            )
+        except asyncio.TimeoutError as e:
+            logging.warning(f"member query for {len(batch)} ids failed: {e}")
+            continue
+        for member in found:
+            members[member.id] = member
+        for user_id in batch:
+            if members[user_id] is None:
+                _remember(guild, user_id, None)
+    return members
+
+
+async def resolve_member(guild, user_id):
+    """Return the member of guild with user_id, or None."""
+    return (await resolve_members(guild, [user_id]))[user_id]
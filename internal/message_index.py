@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+from database.WorldRecords import WorldRecords
+
+
+class MessageIndex:
+    """In-memory map of submission message_id -> WorldRecords id.
+
+    Lets listeners ignore messages that are not personal best submissions
+    without a database round-trip.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._lock = asyncio.Lock()
+        self.loaded = False
+
+    async def ensure_loaded(self):
+        """Build the index from WorldRecords, once."""
+        if self.loaded:
+            return
+        async with self._lock:
+            if self.loaded:
+                return
+            async for document in WorldRecords.collection.find(
+                {}, {"message_id": True}
+            ):
+                self._ids[document["message_id"]] = document["_id"]
+            self.loaded = True
+            logging.info(f"message index loaded {len(self._ids)} records")
+
+    def get(self, message_id):
+        """Return the record id for message_id, or None."""
+        return self._ids.get(message_id)
+
+    def add(self, record, old_message_id=None):
+        """Index a committed record, dropping the message it replaced."""
+        if old_message_id is not None and old_message_id != record.message_id:
+            self._ids.pop(old_message_id, None)
+        self._ids[record.message_id] = record.pk
+
+    def remove(self, record):
+        """Drop a deleted record from the index."""
+        self._ids.pop(record.message_id, None)
+
+    def __len__(self):
+        return len(self._ids)
+
+
+message_index = MessageIndex()
@@ -0,0 +1,217 @@
+import contextvars
+import functools
+import logging
+import threading
+import time
+from collections import defaultdict
+
+# Upper bounds of the latency histogram buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# The command whose work is running in the current task, or None.
+current_command = contextvars.ContextVar("current_command", default=None)
+
+
+class CommandCall:
+    """Database and Discord HTTP work done by one command invocation."""
+
+    __slots__ = ("name", "db_calls", "db_seconds", "http_calls", "http_seconds")
+
+    def __init__(self, name):
+        self.name = name
+        self.db_calls = 0
+        self.db_seconds = 0.0
+        self.http_calls = 0
+        self.http_seconds = 0.0
+
+
+class Histogram:
+    """Cumulative latency histogram with Prometheus-style buckets."""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Return the upper bound of the bucket holding quantile q, or None."""
+        if not self.count:
+            return None
+        for bound, count in zip(BUCKETS, self.counts):
+            if count >= q * self.count:
+                return bound
+        return float("inf")
+
+
+class CommandMetrics:
+    __slots__ = (
+        "latency",
+        "errors",
+        "db_calls",
+        "db_seconds",
+        "http_calls",
+        "http_seconds",
+    )
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors = 0
+        self.db_calls = 0
+        self.db_seconds = 0.0
+        self.http_calls = 0
+        self.http_seconds = 0.0
+
+
+class Metrics:
+    """Per-command latency, error and DB/HTTP call metrics.
+
+    Bot.invoke sets `current_command` for the duration of a command. Tasks
+    started by the command inherit it, and Motor runs database calls on its
+    worker threads in a copy of the caller's context. Database and HTTP
+    calls are therefore charged to the command that caused them.
+    """
+
+    def __init__(self):
+        # DB calls are recorded from Motor's worker threads.
+        self._lock = threading.Lock()
+        self.commands = defaultdict(CommandMetrics)
+        self.http_routes = defaultdict(Histogram)
+
+    def command_finished(self, call, seconds, failed):
+        with self._lock:
+            metrics = self.commands[call.name]
+            metrics.latency.observe(seconds)
+            metrics.errors += failed
+            metrics.db_calls += call.db_calls
+            metrics.db_seconds += call.db_seconds
+            metrics.http_calls += call.http_calls
+            metrics.http_seconds += call.http_seconds
+
+    def db_call(self, seconds):
+        call = current_command.get()
+        if call is not None:
+            with self._lock:
+                call.db_calls += 1
+                call.db_seconds += seconds
+
+    def http_call(self, route, seconds):
+        with self._lock:
+            self.http_routes[route].observe(seconds)
+            call = current_command.get()
+            if call is not None:
+                call.http_calls += 1
+                call.http_seconds += seconds
+
+    def prometheus(self, gauges=()):
+        """Render every metric in the Prometheus text exposition format.
+
+        Args:
+            gauges (iterable): Extra (name, help, value) gauges to include
+
+        """
+        lines = []
+
+        def header(name, kind, description):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, label, histograms):
+            for key, histogram in histograms:
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    lines.append(
+                        f'{name}_bucket{{{label}="{key}",le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    f'{name}_bucket{{{label}="{key}",le="+Inf"}} {histogram.count}'
+                )
+                lines.append(f'{name}_sum{{{label}="{key}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{{label}="{key}"}} {histogram.count}')
+
+        with self._lock:
+            commands = sorted(self.commands.items())
+            routes = sorted(self.http_routes.items())
+
+            header("dfpk_command_duration_seconds", "histogram", "Command latency.")
+            histogram(
+                "dfpk_command_duration_seconds",
+                "command",
+                ((name, metrics.latency) for name, metrics in commands),
+            )
+            for field, description in (
+                ("errors", "Commands that raised an error."),
+                ("db_calls", "Database commands issued by commands."),
+                ("db_seconds", "Time spent in database commands."),
+                ("http_calls", "Discord HTTP requests made by commands."),
+                ("http_seconds", "Time spent in Discord HTTP requests."),
+            ):
+                name = f"dfpk_command_{field}_total"
+                header(name, "counter", description)
+                for command, metrics in commands:
+                    lines.append(
+                        f'{name}{{command="{command}"}} {getattr(metrics, field)}'
+                    )
+
+            header(
+                "dfpk_http_request_duration_seconds",
+                "histogram",
+                "Discord HTTP request latency by route.",
+            )
+            histogram("dfpk_http_request_duration_seconds", "route", routes)
+
+        for name, description, value in gauges:
+            header(name, "gauge", description)
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def instrument_http(http):
+    """Time every request made by a discord.py HTTPClient."""
+    request = http.request
+
+    @functools.wraps(request)
+    async def timed_request(route, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await request(route, *args, **kwargs)
+        finally:
+            metrics.http_call(
+                f"{route.method} {route.path}", time.perf_counter() - started
+            )
+
+    http.request = timed_request
+
+
+async def serve(host, port, gauges):
+    """Serve /metrics in the Prometheus text format.
+
+    Args:
+        host (str): Address to bind, e.g. 127.0.0.1
+        port (int): Port to bind
+        gauges: Function returning extra (name, help, value) gauges
+
+    """
+    from aiohttp import web
+
+    async def handle(request):
+        return web.Response(
+            text=metrics.prometheus(gauges()), content_type="text/plain"
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logging.info(f"serving metrics on http://{host}:{port}/metrics")
@@ -0,0 +1,95 @@
+import logging
+
+from pymongo import UpdateOne
+
+from database.MapData import MapData, creator_tokens
+from database.WorldRecords import WorldRecords, level_key
+from internal import database_init
+
+BATCH_SIZE = 500
+
+
+async def _backfill(collection, query, projection, update, name):
+    """Apply update(document) to every document matching query, in batches.
+
+    Batches keep each write small so the bot can serve commands while
+    a migration is running.
+    """
+    count = 0
+    batch = []
+    async for document in collection.find(query, projection):
+        batch.append(UpdateOne({"_id": document["_id"]}, {"$set": update(document)}))
+        if len(batch) == BATCH_SIZE:
+            await collection.bulk_write(batch, ordered=False)
+            count += len(batch)
+            batch = []
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+        count += len(batch)
+    if count:
+        logging.info(f"migration {name}: updated {count} documents")
+
+
+async def backfill_level_keys():
+    """Add level_key to WorldRecords documents written before it existed."""
+    await _backfill(
+        WorldRecords.collection,
+        {"level_key": {"$exists": False}},
+        {"level": True},
+        lambda document: {"level_key": level_key(document["level"])},
+        "level_key",
+    )
+
+
+async def backfill_creator_tokens():
+    """Add creator_tokens to MapData documents written before it existed."""
+    await _backfill(
+        MapData.collection,
+        {"creator_tokens": {"$exists": False}},
+        {"creator": True},
+        lambda document: {"creator_tokens": creator_tokens(document["creator"])},
+        "creator_tokens",
+    )
+
+
+async def backfill_created_at():
+    """Add created_at to MapData documents, taken from their ObjectId timestamp."""
+    await _backfill(
+        MapData.collection,
+        {"created_at": {"$exists": False}},
+        {"_id": True},
+        lambda document: {"created_at": document["_id"].generation_time},
+        "created_at",
+    )
+
+
+# Commands look records up by level_key, so it must exist before login.
+STARTUP_MIGRATIONS = [("level_key", backfill_level_keys)]
+
+# MapCatalog derives these fields itself while they are missing.
+BACKGROUND_MIGRATIONS = [
+    ("creator_tokens", backfill_creator_tokens),
+    ("created_at", backfill_created_at),
+]
+
+
+async def run_pending(migrations):
+    """Run every migration in migrations that has not completed yet.
+
+    Completed migrations are recorded in the migrations collection,
+    so their queries do not scan the collections on every boot.
+    """
+    collection = database_init.db["migrations"]
+    for name, migration in migrations:
+        if await collection.find_one({"_id": name}):
+            continue
+        await migration()
+        await collection.insert_one({"_id": name})
+
+
+async def run_background():
+    """Run the migrations that can finish while the bot is serving commands."""
+    try:
+        await run_pending(BACKGROUND_MIGRATIONS)
+    except Exception:
+        logging.exception("background migration failed")
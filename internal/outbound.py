@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict
+
+import discord
+
+# Number of messages whose "no reactions" state is remembered.
+CLEARED_MESSAGES = 1024
+
+
+class Outbound:
+    """Per-channel scheduler for outgoing message calls.
+
+    Calls on one channel run in the order they were scheduled, one at a
+    time, while calls on different channels run concurrently. discord.py's
+    HTTP client still applies the bucketed rate limits to every call.
+    Every method returns a task, so callers only wait for the calls whose
+    result they need.
+
+    Redundant calls are coalesced:
+        - edits of a message that haven't started yet are merged into one
+        - clearing reactions of a message that has had none added since
+          its last clear is skipped. Reactions from users are reported by
+          the bot through `reaction_added`.
+
+    `calls`, `coalesced` and `seconds` count API calls, skipped calls and
+    time spent per route.
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+        self.coalesced = Counter()
+        self.seconds = Counter()
+        self._locks = {}
+        self._edits = {}
+        self._cleared = OrderedDict()
+
+    def _schedule(self, channel, coro):
+        lock = self._locks.setdefault(channel.id, asyncio.Lock())
+
+        async def run():
+            async with lock:
+                return await coro
+
+        task = asyncio.ensure_future(run())
+        task.add_done_callback(self._log_failure)
+        return task
+
+    @staticmethod
+    def _log_failure(task):
+        # Retrieve the exception so unawaited tasks don't warn about it.
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"outbound call failed: {task.exception()}")
+
+    async def _call(self, route, coro):
+        started = time.monotonic()
+        try:
+            return await coro
+        finally:
+            self.calls[route] += 1
+            self.seconds[route] += time.monotonic() - started
+
+    @staticmethod
+    def _done():
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(None)
+        return future
+
+    def _set_cleared(self, message, cleared):
+        if cleared:
+            self._cleared[message.id] = True
+            self._cleared.move_to_end(message.id)
+            while len(self._cleared) > CLEARED_MESSAGES:
+                self._cleared.popitem(last=False)
+        else:
+            self._cleared.pop(message.id, None)
+
+    def reaction_added(self, message_id):
+        """Note a reaction added by someone else, so the next clear isn't skipped."""
+        self._cleared.pop(message_id, None)
+
+    def send(self, channel, *args, **kwargs):
+        """Send a message to channel. The task returns the message."""
+        return self._schedule(
+            channel, self._call("send", channel.send(*args, **kwargs))
+        )
+
+    def edit(self, message, **fields):
+        """Edit a message, merged with any pending edit of the same message."""
+        pending = self._edits.get(message.id)
+        if pending is not None:
+            pending[0].update(fields)
+            self.coalesced["edit"] += 1
+            return pending[1]
+
+        fields = dict(fields)
+
+        async def run():
+            # Later edits queue up behind this one from here on.
+            del self._edits[message.id]
+            await self._call("edit", message.edit(**fields))
+
+        task = self._schedule(message.channel, run())
+        self._edits[message.id] = (fields, task)
+        return task
+
+    def delete(self, message):
+        """Delete a message."""
+        self._set_cleared(message, False)
+        return self._schedule(message.channel, self._call("delete", message.delete()))
+
+    def add_reactions(self, message, *emojis):
+        """Add reactions to a message in order."""
+        self._set_cleared(message, False)
+
+        async def run():
+            for emoji in emojis:
+                await self._call("add_reaction", message.add_reaction(emoji))
+
+        return self._schedule(message.channel, run())
+
+    def clear_reactions(self, message):
+        """Remove all reactions from a message, unless it has none since the last clear."""
+        if message.id in self._cleared:
+            self.coalesced["clear_reactions"] += 1
+            return self._done()
+        self._set_cleared(message, True)
+
+        async def run():
+            try:
+                await self._call("clear_reactions", message.clear_reactions())
+            except discord.NotFound:
+                pass
+
+        return self._schedule(message.channel, run())
+
+
+outbound = Outbound()
@@ -0,0 +1,138 @@
+import asyncio
+from collections import OrderedDict
+
+import discord
+from discord.ext import commands
+
+import internal.constants as constants
+from internal.reactions import reactions
+
+
+class LazyPaginator:
+    """Reaction paginator that fetches and renders pages on demand.
+
+    Rows are read in chunks with keyset pagination: fetch(after, limit)
+    returns up to `limit` rows that follow the key `after` (None for the
+    first chunk), and key(row) returns the key of a row.
+    render(rows, chunk_number) builds an embed, or a list of embeds when a
+    chunk needs more than one page. Only the last `window` rendered chunks
+    are kept in memory.
+    """
+
+    def __init__(
+        self,
+        ctx: commands.Context,
+        fetch,
+        render,
+        key,
+        page_size=10,
+        window=3,
+        timeout=120,
+    ):
+        self.ctx = ctx
+        self.fetch = fetch
+        self.render = render
+        self.key = key
+        self.page_size = page_size
+        self.window = window
+        self.timeout = timeout
+        self.message = None
+        self._starts = [None]
+        self._offsets = [0]
+        self._chunks = OrderedDict()
+        self._last_chunk = None
+
+    async def _chunk(self, number):
+        """Return the embeds of a chunk, or an empty list if it has no rows."""
+        if number in self._chunks:
+            self._chunks.move_to_end(number)
+            return self._chunks[number]
+
+        rows = await self.fetch(self._starts[number], self.page_size + 1)
+        if not rows:
+            self._last_chunk = number - 1
+            return []
+        has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if has_next and len(self._starts) == number + 1:
+            self._starts.append(self.key(rows[-1]))
+        if not has_next:
+            self._last_chunk = number
+
+        embeds = self.render(rows, number)
+        if isinstance(embeds, discord.Embed):
+            embeds = [embeds]
+        if len(self._offsets) == number + 1:
+            self._offsets.append(self._offsets[number] + len(embeds))
+        self._chunks[number] = embeds
+        while len(self._chunks) > self.window:
+            self._chunks.popitem(last=False)
+        return embeds
+
+    def _footer(self, embed, chunk, index):
+        total = ""
+        if self._last_chunk is not None and len(self._offsets) > self._last_chunk + 1:
+            total = f"/{self._offsets[self._last_chunk + 1]}"
+        embed.set_footer(text=f"Page {self._offsets[chunk] + index + 1}{total}")
+        return embed
+
+    async def run(self):
+        """Send the first page and handle page turns until timeout.
+
+        Returns:
+            bool: False if there was nothing to display.
+
+        """
+        chunk, index = 0, 0
+        embeds = await self._chunk(chunk)
+        if not embeds:
+            return False
+        self.message = await self.ctx.send(embed=self._footer(embeds[0], 0, 0))
+        if self._last_chunk == 0 and len(embeds) == 1:
+            return True
+
+        await self.message.add_reaction(constants.LEFT_REACTION_EMOJI)
+        await self.message.add_reaction(constants.RIGHT_REACTION_EMOJI)
+
+        while True:
+            try:
+                reaction = await reactions.wait(
+                    self.message.id,
+                    self.ctx.author.id,
+                    (constants.LEFT_REACTION_EMOJI, constants.RIGHT_REACTION_EMOJI),
+                    timeout=self.timeout,
+                )
+            except asyncio.TimeoutError:
+                try:
+                    await self.message.clear_reactions()
+                except discord.HTTPException:
+                    pass
+                return True
+
+            try:
+                await self.message.remove_reaction(
+                    reaction.emoji, discord.Object(reaction.user_id)
+                )
+            except discord.HTTPException:
+                pass
+
+            if str(reaction.emoji) == constants.LEFT_REACTION_EMOJI:
+                if index > 0:
+                    new_chunk, new_index = chunk, index - 1
+                elif chunk > 0:
+                    new_chunk, new_index = chunk - 1, -1
+                else:
+                    continue
+            else:
+                if index + 1 < len(await self._chunk(chunk)):
+                    new_chunk, new_index = chunk, index + 1
+                elif chunk != self._last_chunk:
+                    new_chunk, new_index = chunk + 1, 0
+                else:
+                    continue
+
+            embeds = await self._chunk(new_chunk)
+            if not embeds:
+                continue
+            chunk, index = new_chunk, new_index % len(embeds)
+            await self.message.edit(embed=self._footer(embeds[index], chunk, index))
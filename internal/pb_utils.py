@@ -1,4 +1,3 @@
-import datetime
 import re
 
 import discord
@@ -7,19 +6,38 @@ from database.MapData import MapData
 import pymongo
 
 import internal.constants as constants
-from database.WorldRecords import WorldRecords
+from database.WorldRecords import WorldRecords, level_key
+from internal.board_cache import board_cache
+from internal.message_index import message_index
+from internal.wr_table import wr_table
 
 
-async def boards(ctx, map_code, level, title, query):
+async def record_saved(record, created=False, old_message_id=None):
+    """Update in-memory record state after a WorldRecords commit."""
+    message_index.add(record, old_message_id)
+    board_cache.invalidate(record.code, record.level_key)
+    await wr_table.saved(record, created)
+
+
+async def record_deleted(record):
+    """Update in-memory record state after a WorldRecords deletion."""
+    message_index.remove(record)
+    board_cache.invalidate(record.code, record.level_key)
+    await wr_table.removed(record)
+
+
+async def boards(ctx, map_code, level, title, verified_only):
+    """Display the top records of a level, served from the board cache."""
     count = 1
     exists = False
     embed = discord.Embed(title=f"{title}")
-    async for entry in WorldRecords.find(query).sort("record", 1).limit(10):
+    rows = await board_cache.get(map_code, level_key(level), verified_only)
+    for entry, record in zip(rows, display_records(row.record for row in rows)):
         exists = True
         embed.add_field(
             name=f"#{count} - {entry.name}",
             value=(
-                f"> Record: {display_record(entry.record)}\n"
+                f"> Record: {record}\n"
                 f"> Verified: {constants.VERIFIED_EMOJI if entry.verified is True else constants.NOT_VERIFIED_EMOJI}"
             ),
             inline=False,
@@ -31,54 +49,182 @@ async def boards(ctx, map_code, level, title, query):
         await ctx.send(f"No scoreboard for {map_code} level {level.upper()}!")
 
 
-def is_time_format(s):
-    """Check if string is in HH:MM:SS.SS format or a legal variation."""
-    return bool(
-        re.compile(
-            r"(?<!.)(\d{1,2})?:?(\d{2})?:?(?<!\d)(\d{1,2})\.?\d{1,2}?(?!.)"
-        ).match(s)
+async def personal_bests(query, after=None, limit=None):
+    """Find personal bests matching query, grouped by map code.
+
+    Records are grouped and joined with their MapData in a single aggregation.
+
+    Args:
+        query (dict): WorldRecords filter
+        after (str, optional): Only return maps with a code after this one
+        limit (int, optional): Maximum amount of maps to return
+
+    Returns:
+        list: dicts with code, map_name, creator and records (level, record, verified),
+        sorted by code. map_name and creator are None if the map is not in MapData.
+
+    """
+    if after is not None:
+        query = {"$and": [query, {"code": {"$gt": after}}]}
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"code": pymongo.ASCENDING, "level": pymongo.ASCENDING}},
+        {
+            "$group": {
+                "_id": "$code",
+                "records": {
+                    "$push": {
+                        "level": "$level",
+                        "record": "$record",
+                        "verified": "$verified",
+                    }
+                },
+            }
+        },
+        {"$sort": {"_id": pymongo.ASCENDING}},
+        *([{"$limit": limit}] if limit else []),
+        {
+            "$lookup": {
+                "from": MapData.collection.name,
+                "localField": "_id",
+                "foreignField": "code",
+                "as": "map",
+            }
+        },
+        {
+            "$project": {
+                "_id": False,
+                "code": "$_id",
+                "records": True,
+                "map_name": {"$arrayElemAt": ["$map.map_name", 0]},
+                "creator": {"$arrayElemAt": ["$map.creator", 0]},
+            }
+        },
+    ]
+    return await WorldRecords.collection.aggregate(pipeline).to_list(length=None)
+
+
+async def level_bests(query, verified_only=True):
+    """Find the fastest record of every level matching query.
+
+    Sorting and grouping happen in the database, so only one document
+    per (code, level_key) is transferred.
+
+    Args:
+        query (dict): WorldRecords filter, usually {"code": map_code}
+        verified_only (bool, optional): Only consider verified records.
+            If False, verified records still rank ahead of unverified ones.
+
+    Returns:
+        list: dicts with _id, code, level_key, name, record, url, verified and
+        count (records on the level), sorted by code and level_key.
+
+    """
+    if verified_only:
+        query = {**query, "verified": True}
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"code": 1, "level_key": 1, "verified": -1, "record": 1}},
+        {
+            "$group": {
+                "_id": {"code": "$code", "level_key": "$level_key"},
+                "record_id": {"$first": "$_id"},
+                "name": {"$first": "$name"},
+                "record": {"$first": "$record"},
+                "url": {"$first": "$url"},
+                "verified": {"$first": "$verified"},
+                "count": {"$sum": 1},
+            }
+        },
+        {"$sort": {"_id.code": 1, "_id.level_key": 1}},
+        {
+            "$project": {
+                "_id": "$record_id",
+                "code": "$_id.code",
+                "level_key": "$_id.level_key",
+                "name": True,
+                "record": True,
+                "url": True,
+                "verified": True,
+                "count": True,
+            }
+        },
+    ]
+    return await WorldRecords.collection.aggregate(pipeline).to_list(length=None)
+
+
+# [[HH:]MM:]SS[.ss] - hours and minutes may be omitted, at most two decimals.
+# Without hours, minutes may exceed 59 ("100:00"); seconds may be left out
+# before a fraction (".5").
+_TIME_FORMAT = re.compile(
+    r"(?:(?:(?P<hours>[0-9]{1,2}):(?P<minutes>[0-9]{1,2})|(?P<total_minutes>[0-9]+)):)?"
+    r"(?P<seconds>[0-9]*)(?:\.(?P<fraction>[0-9]{1,2}))?"
+)
+
+
+def parse_centiseconds(time_input):
+    """Validate and convert a time (str) into whole centiseconds (int).
+
+    Returns:
+        int: Centiseconds, or None if time_input isn't a valid time
+
+    """
+    match = _TIME_FORMAT.fullmatch(time_input.strip())
+    if match is None:
+        return None
+    hours, minutes, total_minutes, seconds, fraction = match.group(
+        "hours", "minutes", "total_minutes", "seconds", "fraction"
     )
+    has_minutes = minutes is not None or total_minutes is not None
+    if not seconds and (has_minutes or fraction is None):
+        return None
+    if has_minutes and (len(seconds) > 2 or int(seconds) >= 60):
+        return None
+    if minutes is not None and int(minutes) >= 60:
+        return None
+    minutes = int(hours or 0) * 60 + int(minutes or total_minutes or 0)
+    centiseconds = int((fraction or "").ljust(2, "0"))
+    return (minutes * 60 + int(seconds or 0)) * 100 + centiseconds
 
 
 def time_convert(time_input):
-    """Convert time (str) into seconds (float)."""
-    time_list = time_input.split(":")
-    if len(time_list) == 1:
-        return float(time_list[0])
-    elif len(time_list) == 2:
-        return float((int(time_list[0]) * 60) + float(time_list[1]))
-    elif len(time_list) == 3:
-        return float(
-            (int(time_list[0]) * 3600) + (int(time_list[1]) * 60) + float(time_list[2])
-        )
-    return
+    """Convert time (str) into seconds (float), or None if it isn't a valid time."""
+    centiseconds = parse_centiseconds(time_input)
+    if centiseconds is None:
+        return None
+    return centiseconds / 100
+
+
+def time_convert_all(time_inputs):
+    """Convert many times at once, e.g. for bulk imports. Invalid times are None."""
+    return [time_convert(time_input) for time_input in time_inputs]
 
 
 def display_record(record):
-    """Display record in HH:MM:SS.SS format."""
-    if check_negative(record):
-        return format_timedelta(record)
-    elif str(datetime.timedelta(seconds=record)).count(".") == 1:
-        return str(datetime.timedelta(seconds=record))[: -4 or None]
-    return str(datetime.timedelta(seconds=record)) + ".00"
-
-
-def check_negative(s):
-    try:
-        f = float(s)
-        if f < 0:
-            return True
-        # Otherwise return false
-        return False
-    except ValueError:
-        return False
-
-
-def format_timedelta(td):
-    if datetime.timedelta(seconds=td) < datetime.timedelta(0):
-        return "-" + format_timedelta(-td)
-    else:
-        return str(td)
+    """Display record in HH:MM:SS.SS format.
+
+    Same output as formatting datetime.timedelta(seconds=record) and cutting
+    it to hundredths, computed with integer arithmetic only. Negative
+    records are shown as the raw number with a leading "-".
+    """
+    if record < 0:
+        return "-" + str(-record)
+    whole = int(record)
+    # timedelta rounds the fraction half-to-even to whole microseconds.
+    microseconds = whole * 1_000_000 + round((record - whole) * 1_000_000)
+    seconds, microseconds = divmod(microseconds, 1_000_000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    text = f"{hours}:{minutes:02d}:{seconds:02d}.{microseconds // 10_000:02d}"
+    if days:
+        return f"{days} day{'s' if days != 1 else ''}, {text}"
+    return text
+
+
+def display_records(records):
+    """Display a column of records, e.g. every record on a page, at once."""
+    return [display_record(record) for record in records]
 
 
 async def search_all_pbs(ctx, query, name=""):
@@ -0,0 +1,53 @@
+import asyncio
+
+
+class ReactionRouter:
+    """Routes reaction events to the coroutines waiting on them.
+
+    Waiters are kept by message id, so each event costs one dict lookup
+    no matter how many confirmations or paginators are open. The bot feeds
+    every on_raw_reaction_add payload to `dispatch`.
+    """
+
+    def __init__(self):
+        self._waiters = {}
+
+    @property
+    def pending(self):
+        """Number of coroutines waiting for a reaction."""
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def wait(self, message_id, user_id, emojis, timeout):
+        """Wait for user_id to react to message_id with one of emojis.
+
+        Returns:
+            discord.RawReactionActionEvent: The reaction
+
+        Raises:
+            asyncio.TimeoutError: If nobody reacted within timeout seconds
+
+        """
+        future = asyncio.get_event_loop().create_future()
+        waiter = (user_id, emojis, future)
+        self._waiters.setdefault(message_id, []).append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            waiters = self._waiters.get(message_id)
+            if waiters is not None:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[message_id]
+
+    def dispatch(self, payload):
+        """Resolve the waiters a reaction event is meant for."""
+        waiters = self._waiters.get(payload.message_id)
+        if not waiters:
+            return
+        emoji = str(payload.emoji)
+        for user_id, emojis, future in waiters:
+            if user_id == payload.user_id and emoji in emojis and not future.done():
+                future.set_result(payload)
+
+
+reactions = ReactionRouter()
@@ -0,0 +1,200 @@
+import asyncio
+import datetime
+import json
+import logging
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+from internal.metrics import current_command
+
+# Operations worth recording; cursor, session and server commands are not.
+OPERATIONS = {
+    "find",
+    "aggregate",
+    "count",
+    "distinct",
+    "update",
+    "delete",
+    "findAndModify",
+    "insert",
+}
+# Operations that are explained. Explaining a write never runs it, but
+# reads are what the log is for.
+EXPLAINED = {"find", "aggregate", "count", "distinct"}
+
+# Number of entries kept in memory for the slowqueries command.
+RECENT_ENTRIES = 100
+
+# A query shape is explained at most once per interval.
+EXPLAIN_INTERVAL_SECONDS = 600
+
+
+def shape(value):
+    """Replace the values of a filter or pipeline with 1, keeping its structure."""
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = []
+        for item in map(shape, value):
+            if item not in shapes:
+                shapes.append(item)
+        return shapes
+    return 1
+
+
+def _filter_shape(command_name, command):
+    if command_name == "aggregate":
+        return [
+            {name: shape(stage[name]) if name == "$match" else 1}
+            for stage in command.get("pipeline", [])
+            for name in stage
+        ]
+    if command_name in ("update", "delete"):
+        # Each update/delete statement holds its filter under "q".
+        statements = command.get(f"{command_name}s", [])
+        return shape([statement.get("q") for statement in statements])
+    if command_name in ("find", "findAndModify"):
+        return shape(command.get("filter", command.get("query", {})))
+    if command_name in ("count", "distinct"):
+        return shape(command.get("query", {}))
+    return None
+
+
+def _find_key(document, key):
+    """Return the first value stored under key anywhere in document."""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        items = document.values()
+    elif isinstance(document, list):
+        items = document
+    else:
+        return None
+    for item in items:
+        found = _find_key(item, key)
+        if found is not None:
+            return found
+    return None
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Records database operations slower than a threshold.
+
+    Each entry has the operation, collection, filter shape, duration and
+    the bot command that issued it. Reads are explained once per shape per
+    EXPLAIN_INTERVAL_SECONDS to add the plan's stages, indexes and
+    documents examined versus returned. Entries go to a rotating log file
+    and the last RECENT_ENTRIES are kept for the slowqueries command.
+    """
+
+    def __init__(self):
+        self.threshold_ms = None
+        self.recent = deque(maxlen=RECENT_ENTRIES)
+        self._started = {}
+        self._lock = threading.Lock()
+        self._explained = {}
+        self._loop = None
+        self._logger = logging.getLogger("slow_queries")
+
+    def start(self, threshold_ms, path="logs/slow_queries.log"):
+        """Start recording operations slower than threshold_ms to path."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            path, maxBytes=1_000_000, backupCount=5, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger.addHandler(handler)
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._loop = asyncio.get_event_loop()
+        self.threshold_ms = threshold_ms
+
+    # Called from Motor's worker threads.
+
+    def started(self, event):
+        if self.threshold_ms is None or event.command_name not in OPERATIONS:
+            return
+        with self._lock:
+            self._started[(event.connection_id, event.request_id)] = (
+                event.command,
+                current_command.get(),
+            )
+
+    def succeeded(self, event):
+        self._finished(event, failed=False)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+    def _finished(self, event, failed):
+        with self._lock:
+            started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        command, call = started
+        entry = {
+            "time": datetime.datetime.utcnow().isoformat(timespec="seconds"),
+            "operation": event.command_name,
+            "collection": command.get(event.command_name),
+            "database": event.database_name,
+            "shape": _filter_shape(event.command_name, command),
+            "command": call.name if call is not None else None,
+            "duration_ms": round(duration_ms, 1),
+            "failed": failed,
+        }
+        self._loop.call_soon_threadsafe(self._add, entry, command)
+
+    # Called on the event loop.
+
+    def _add(self, entry, command):
+        key = (entry["database"], entry["collection"], repr(entry["shape"]))
+        now = time.monotonic()
+        if entry["operation"] in EXPLAINED and self._explained.get(key, 0) <= now:
+            self._explained[key] = now + EXPLAIN_INTERVAL_SECONDS
+            asyncio.ensure_future(self._explain_and_log(entry, command))
+        else:
+            self._log(entry)
+
+    async def _explain_and_log(self, entry, command):
+        from internal import database_init
+
+        explain = {
+            key: value
+            for key, value in command.items()
+            if not key.startswith("$") and key not in ("lsid", "txnNumber")
+        }
+        try:
+            result = await database_init.db.client[entry["database"]].command(
+                {"explain": explain, "verbosity": "executionStats"}
+            )
+        except PyMongoError as e:
+            entry["explain"] = {"error": str(e)}
+        else:
+            plan = _find_key(result, "winningPlan") or {}
+            stats = _find_key(result, "executionStats") or {}
+            stages = database_init.plan_stages(plan) if plan else []
+            entry["explain"] = {
+                "stages": [stage for stage, _ in stages if stage],
+                "indexes": [index for _, index in stages if index],
+                "keys_examined": stats.get("totalKeysExamined"),
+                "docs_examined": stats.get("totalDocsExamined"),
+                "returned": stats.get("nReturned"),
+            }
+        self._log(entry)
+
+    def _log(self, entry):
+        self.recent.append(entry)
+        self._logger.info(json.dumps(entry, default=str))
+
+
+slow_query_log = SlowQueryLog()
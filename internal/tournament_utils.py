@@ -1,23 +1,21 @@
+import asyncio
+import datetime
 import logging
-import sys
+import time
+
 import discord
-from disputils import BotEmbedPaginator
 
+import internal.constants as constants
 from database.BonusData import BonusData
+from database.ExportCursor import ExportCursor
+from database.ExportedMessage import ExportedMessage
 from database.HardcoreData import HardcoreData
 from database.MildcoreData import MildcoreData
 from database.TimeAttackData import TimeAttackData
-from internal.pb_utils import display_record
-
-if len(sys.argv) > 1:
-    if sys.argv[1] == "test":
-        from internal import (
-            constants_bot_test as constants_bot,
-            constants,
-            confirmation,
-        )
-else:
-    from internal import constants_bot_prod as constants_bot
+from internal import confirmation, constants_bot
+from internal.members import resolve_members
+from internal.paginator import LazyPaginator
+from internal.pb_utils import display_records
 
 
 def category_sort(message):
@@ -36,10 +34,6 @@ def category_sort(message):
 
 async def tournament_boards(ctx, category):
     """Display boards for scoreboard and leaderboard commands."""
-    count = 0
-    embed = discord.Embed(title=f"{category}")
-    embeds = []
-
     if category == "TIMEATTACK":
         _data_category = TimeAttackData
     elif category == "MILDCORE":
@@ -49,28 +43,75 @@ async def tournament_boards(ctx, category):
     else:  # "BONUS"
         _data_category = BonusData
 
-    data_amount = await _data_category.count_documents()
+    members = {}
 
-    async for entry in _data_category.find().sort("record", 1):
-        embed.add_field(
-            name=f"#{count + 1} - {discord.utils.find(lambda m: m.id == entry.posted_by, ctx.guild.members)}",
-            value=f"> Record: {display_record(entry.record)}\n",
-            inline=False,
+    async def fetch(after, limit):
+        query = {}
+        if after is not None:
+            record, _id = after
+            query = {
+                "$or": [
+                    {"record": {"$gt": record}},
+                    {"record": record, "_id": {"$gt": _id}},
+                ]
+            }
+        rows = (
+            await _data_category.find(query)
+            .sort([("record", 1), ("_id", 1)])
+            .limit(limit)
+            .to_list(length=None)
+        )
+        members.update(
+            await resolve_members(ctx.guild, (entry.posted_by for entry in rows))
         )
-        if (count + 1) % 10 == 0 or (count + 1) == data_amount:
-            embeds.append(embed)
-            embed = discord.Embed(title=category)
+        return rows
 
-        count += 1
+    def render(rows, page_number):
+        embed = discord.Embed(title=category)
+        records = display_records(entry.record for entry in rows)
+        for count, (entry, record) in enumerate(zip(rows, records), page_number * 10):
+            embed.add_field(
+                name=f"#{count + 1} - {members.get(entry.posted_by) or entry.posted_by}",
+                value=f"> Record: {record}\n",
+                inline=False,
+            )
+        return embed
 
-    if embeds:
-        paginator = BotEmbedPaginator(ctx, embeds)
-        await paginator.run()
-    else:
+    paginator = LazyPaginator(
+        ctx, fetch, render, key=lambda entry: (entry.record, entry.pk)
+    )
+    if not await paginator.run():
         await ctx.send(f"No times exist for the {category.lower()} tournament!")
 
 
+async def _export_webhooks(channel):
+    """Return up to EXPORT_WEBHOOKS webhooks of channel, creating them if needed.
+
+    Returns an empty list if the bot can't manage webhooks in channel.
+    """
+    if not channel.permissions_for(channel.guild.me).manage_webhooks:
+        return []
+    webhooks = [
+        webhook
+        for webhook in await channel.webhooks()
+        if webhook.name == constants.EXPORT_WEBHOOK_NAME and webhook.token
+    ]
+    while len(webhooks) < constants.EXPORT_WEBHOOKS:
+        webhooks.append(
+            await channel.create_webhook(name=constants.EXPORT_WEBHOOK_NAME)
+        )
+    return webhooks[: constants.EXPORT_WEBHOOKS]
+
+
 async def exporter(ctx, category, channel):
+    """Post every screenshot of a category to channel, fastest first.
+
+    Screenshots are sent through the channel's export webhooks, up to
+    EXPORT_EMBEDS_PER_MESSAGE per message, with one sender per webhook.
+    Without webhook permissions they are sent one per message with
+    EXPORT_CONCURRENCY senders. Progress is saved in ExportCursor after
+    every message, so running the export again resumes where it stopped.
+    """
     if category == "TIMEATTACK":
         _data_category = TimeAttackData
     elif category == "MILDCORE":
@@ -80,18 +121,192 @@ async def exporter(ctx, category, channel):
     else:  # "BONUS"
         _data_category = BonusData
 
-    async for entry in _data_category.find().sort("record", 1):
-        username = discord.utils.find(
-            lambda m: m.id == entry.posted_by, ctx.guild.members
+    started = time.monotonic()
+    cursor = await ExportCursor.find_one(
+        {"data_collection": _data_category.collection.name}
+    )
+    # Progress made in another channel doesn't carry over.
+    if cursor is not None and cursor.channel_id != channel.id:
+        await cursor.delete()
+        cursor = None
+    if cursor is None:
+        cursor = ExportCursor(
+            data_collection=_data_category.collection.name,
+            channel_id=channel.id,
+            sent=0,
         )
+        query = {}
+    else:
+        query = {
+            "$or": [
+                {"record": {"$gt": cursor.record}},
+                {"record": cursor.record, "_id": {"$gt": cursor.last_id}},
+            ]
+        }
+        await ctx.send(f"Resuming export after {cursor.sent} screenshots.")
+    resumed_from = cursor.sent
 
+    entries = (
+        await _data_category.find(query)
+        .sort([("record", 1), ("_id", 1)])
+        .to_list(length=None)
+    )
+    members = await resolve_members(ctx.guild, (entry.posted_by for entry in entries))
+    records = display_records(entry.record for entry in entries)
+    embeds = []
+    for rank, (entry, record) in enumerate(zip(entries, records), resumed_from + 1):
+        username = members[entry.posted_by]
         embed = discord.Embed(
-            title=username.name,
+            title=username.name if username else str(entry.posted_by),
             url=entry.attachment_url,
         )
-        embed.add_field(name=category, value=f"{display_record(entry.record)}")
+        embed.add_field(name=f"{category} #{rank}", value=record)
         embed.set_image(url=entry.attachment_url)
-        await channel.send(embed=embed)
+        embeds.append(embed)
+
+    webhooks = await _export_webhooks(channel)
+    if webhooks:
+        size = constants.EXPORT_EMBEDS_PER_MESSAGE
+        senders = [
+            lambda batch, webhook=webhook: webhook.send(
+                embeds=batch, username=ctx.guild.me.display_name, wait=True
+            )
+            for webhook in webhooks
+        ]
+    else:
+        size = 1
+        senders = [
+            lambda batch: channel.send(embed=batch[0])
+        ] * constants.EXPORT_CONCURRENCY
+
+    queue = asyncio.Queue()
+    for index, start in enumerate(range(0, len(embeds), size)):
+        queue.put_nowait((index, start, start + size))
+    done = set()
+    next_index = 0
+    lock = asyncio.Lock()
+
+    async def advance(index):
+        """Move the cursor past every batch sent so far without gaps."""
+        nonlocal next_index
+        async with lock:
+            done.add(index)
+            end = None
+            while next_index in done:
+                end = min((next_index + 1) * size, len(entries))
+                next_index += 1
+            if end is None:
+                return
+            cursor.record = entries[end - 1].record
+            cursor.last_id = entries[end - 1].pk
+            cursor.sent = resumed_from + end
+            await cursor.commit()
+
+    failed = False
+
+    async def send_all(send):
+        nonlocal failed
+        # After the first error no sender takes a new batch, so only batches
+        # already in flight are posted past the failed one.
+        while not failed and not queue.empty():
+            index, start, end = queue.get_nowait()
+            try:
+                message = await send(embeds[start:end])
+                await ExportedMessage(
+                    message_id=message.id, channel_id=channel.id
+                ).commit()
+                await advance(index)
+            except Exception:
+                failed = True
+                raise
+
+    results = await asyncio.gather(
+        *(send_all(send) for send in senders), return_exceptions=True
+    )
+    errors = [result for result in results if isinstance(result, Exception)]
+    sent = cursor.sent - resumed_from
+    elapsed = time.monotonic() - started
+    if errors:
+        logging.warning(f"export of {category} interrupted: {errors[0]}")
+        await ctx.send(
+            f"Export interrupted after {cursor.sent} screenshots. "
+            "Run the command again to resume."
+        )
+        return
+
+    if cursor.is_created:
+        await cursor.delete()
+    await ctx.send(
+        f"Exported {sent} screenshots in {elapsed:.1f}s "
+        f"({sent / elapsed if elapsed else 0:.1f}/s)."
+    )
+
+
+async def delete_exported(channel, progress):
+    """Delete every message the exporter posted in channel.
+
+    Messages are bulk deleted 100 at a time. Those older than 14 days can't
+    be bulk deleted and are removed one by one.
+
+    Args:
+        channel (:obj: `discord.TextChannel`)
+        progress: Coroutine function called with (deleted, total) every 100 messages
+
+    Returns:
+        int: Number of messages deleted
+
+    """
+    message_ids = [
+        document["message_id"]
+        async for document in ExportedMessage.collection.find(
+            {"channel_id": channel.id}, {"message_id": True}
+        )
+    ]
+    # Keep a margin so no message ages out while its batch is in flight.
+    cutoff = (
+        datetime.datetime.utcnow()
+        - datetime.timedelta(days=constants.BULK_DELETE_MAX_AGE_DAYS)
+        + datetime.timedelta(minutes=5)
+    )
+    recent = [i for i in message_ids if discord.utils.snowflake_time(i) > cutoff]
+    old = [i for i in message_ids if discord.utils.snowflake_time(i) <= cutoff]
+    batches = [
+        recent[start : start + constants.BULK_DELETE_LIMIT]
+        for start in range(0, len(recent), constants.BULK_DELETE_LIMIT)
+    ] + [[message_id] for message_id in old]
+
+    deleted = 0
+    reported = 0
+    for batch in batches:
+        try:
+            await channel.delete_messages(
+                [discord.Object(message_id) for message_id in batch]
+            )
+        except discord.NotFound:
+            # Already deleted by hand.
+            pass
+        except discord.HTTPException:
+            # A bulk delete fails as a whole; retry its messages one by one.
+            for message_id in batch:
+                try:
+                    await channel.delete_messages([discord.Object(message_id)])
+                except discord.NotFound:
+                    pass
+        await ExportedMessage.collection.delete_many({"message_id": {"$in": batch}})
+        deleted += len(batch)
+        if deleted - reported >= constants.BULK_DELETE_LIMIT:
+            reported = deleted
+            await progress(deleted, len(message_ids))
+    return deleted
+
+
+async def _clear_collection(document):
+    """Drop a tournament collection along with its export progress."""
+    await document.collection.drop()
+    await document.ensure_indexes()
+    await ExportCursor.collection.delete_many(
+        {"data_collection": document.collection.name}
+    )
 
 
 async def confirm_collection_drop(ctx, category):
@@ -112,24 +327,24 @@ async def confirm_collection_drop(ctx, category):
 
         if category == "all":
             msg_ta = await ctx.send("Clearing all time attack times... Please wait.")
-            await TimeAttackData.collection.drop()
+            await _clear_collection(TimeAttackData)
             await msg_ta.edit(content="All times in time attack have been cleared.")
 
             msg_mc = await ctx.send("Clearing all mildcore times... Please wait.")
-            await MildcoreData.collection.drop()
+            await _clear_collection(MildcoreData)
             await msg_mc.edit(content="All times in mildcore have been cleared.")
 
             msg_hc = await ctx.send("Clearing all hardcore times... Please wait.")
-            await HardcoreData.collection.drop()
+            await _clear_collection(HardcoreData)
             await msg_hc.edit(content="All times in hardcore have been cleared.")
 
             msg_bonus = await ctx.send("Clearing all bonus times... Please wait.")
-            await BonusData.collection.drop()
+            await _clear_collection(BonusData)
             await msg_bonus.edit(content="All times in bonus have been cleared.")
 
         else:
             msg = await ctx.send(f"Clearing {category} times... Please wait.")
-            await _collection.collection.drop()
+            await _clear_collection(_collection)
             await msg.edit(
                 content=f"All times {'in' if category != 'all' else ''} {category if category != 'all' else ''} have been cleared."
             )
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from collections import namedtuple
+
+from database.WorldRecords import WorldRecords
+
+WorldRecord = namedtuple("WorldRecord", ["id", "level", "name", "record", "url"])
+
+_PROJECTION = {
+    "code": True,
+    "level_key": True,
+    "name": True,
+    "record": True,
+    "url": True,
+    "verified": True,
+}
+
+
+def _row(document):
+    """Build a WorldRecord from a WorldRecords document or raw dict."""
+    if isinstance(document, dict):
+        return WorldRecord(
+            document["_id"],
+            document["level_key"],
+            document["name"],
+            document["record"],
+            document["url"],
+        )
+    return WorldRecord(
+        document.pk,
+        document.level_key,
+        document.name,
+        document.record,
+        document.url,
+    )
+
+
+class _Level:
+    """Number of records on a level and its current verified world record."""
+
+    __slots__ = ("count", "best")
+
+    def __init__(self):
+        self.count = 0
+        self.best = None
+
+
+class WorldRecordTable:
+    """In-process table of the current world record per (code, level).
+
+    Built once from a pb_utils.level_bests aggregation, then updated
+    incrementally by the submit, verify, reject and delete paths through
+    `saved` and `removed`.
+    Only a change that takes a world record away costs a database read.
+    """
+
+    def __init__(self):
+        self._maps = {}
+        self._lock = asyncio.Lock()
+        self.loaded = False
+
+    async def ensure_loaded(self):
+        """Build the table from WorldRecords, once."""
+        if self.loaded:
+            return
+        async with self._lock:
+            if self.loaded:
+                return
+            # pb_utils imports this module for its write hooks.
+            from internal.pb_utils import level_bests
+
+            maps = {}
+            for document in await level_bests({}, verified_only=False):
+                level = maps.setdefault(document["code"], {}).setdefault(
+                    document["level_key"], _Level()
+                )
+                level.count = document["count"]
+                if document["verified"] is True:
+                    level.best = _row(document)
+            self._maps = maps
+            self.loaded = True
+            logging.info(f"world record table loaded {len(maps)} maps")
+
+    async def levels(self, code):
+        """Return every level name with a record on code, in natural order."""
+        from natsort import natsorted
+
+        await self.ensure_loaded()
+        return natsorted(self._maps.get(code, {}))
+
+    async def world_records(self, code):
+        """Return the verified world record of every level on code, in natural level order."""
+        from natsort import natsorted
+
+        await self.ensure_loaded()
+        levels = self._maps.get(code, {})
+        return [
+            levels[key].best
+            for key in natsorted(levels)
+            if levels[key].best is not None
+        ]
+
+    async def world_record(self, code, level_key):
+        """Return the verified world record of a level, or None."""
+        await self.ensure_loaded()
+        level = self._maps.get(code, {}).get(level_key)
+        return level.best if level is not None else None
+
+    async def _recompute(self, code, level_key, level):
+        document = await WorldRecords.collection.find_one(
+            {"code": code, "level_key": level_key, "verified": True},
+            _PROJECTION,
+            sort=[("record", 1)],
+        )
+        level.best = _row(document) if document else None
+
+    async def saved(self, record, created=False):
+        """Update the table after a record was committed."""
+        if not self.loaded:
+            return
+        level = self._maps.setdefault(record.code, {}).setdefault(
+            record.level_key, _Level()
+        )
+        if created:
+            level.count += 1
+        holder = level.best is not None and level.best.id == record.pk
+        if record.verified is True:
+            if holder or level.best is None or record.record < level.best.record:
+                level.best = _row(record)
+        elif holder:
+            await self._recompute(record.code, record.level_key, level)
+
+    async def removed(self, record):
+        """Update the table after a record was deleted."""
+        if not self.loaded:
+            return
+        levels = self._maps.get(record.code, {})
+        level = levels.get(record.level_key)
+        if level is None:
+            return
+        level.count -= 1
+        if level.count <= 0:
+            del levels[record.level_key]
+            if not levels:
+                del self._maps[record.code]
+        elif level.best is not None and level.best.id == record.pk:
+            await self._recompute(record.code, record.level_key, level)
+
+
+wr_table = WorldRecordTable()
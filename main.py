@@ -6,6 +6,7 @@ import sys
 
 from internal import database_init
 from internal.botclass import Bot
+from internal.slow_queries import slow_query_log
 
 if len(sys.argv) > 1:
     if sys.argv[1] == "test":
@@ -51,8 +52,39 @@ async def run():
 
         return v
 
+    def to_bool(v):
+        """Env variables are strings, config values are already booleans."""
+        return v if isinstance(v, bool) else v.lower() in ("1", "true", "yes")
+
     config = load_config()
 
+    # (client option, env name, config name, type). Unset options keep driver defaults.
+    mongo_options = [
+        ("maxPoolSize", "MONGO_MAX_POOL_SIZE", "mongoMaxPoolSize", int),
+        ("minPoolSize", "MONGO_MIN_POOL_SIZE", "mongoMinPoolSize", int),
+        (
+            "waitQueueTimeoutMS",
+            "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+            "mongoWaitQueueTimeoutMS",
+            int,
+        ),
+        (
+            "serverSelectionTimeoutMS",
+            "MONGO_SERVER_SELECTION_TIMEOUT_MS",
+            "mongoServerSelectionTimeoutMS",
+            int,
+        ),
+        ("compressors", "MONGO_COMPRESSORS", "mongoCompressors", str),
+        ("retryWrites", "MONGO_RETRY_WRITES", "mongoRetryWrites", to_bool),
+        ("retryReads", "MONGO_RETRY_READS", "mongoRetryReads", to_bool),
+        ("readPreference", "MONGO_READ_PREFERENCE", "mongoReadPreference", str),
+    ]
+    client_options = {}
+    for option, env_name, config_name, convert in mongo_options:
+        value = get_config_var(env_name, config, config_name)
+        if value is not None:
+            client_options[option] = convert(value)
+
     database_init.init(
         get_config_var(
             "MONGO_CONNECTION_STRING", config, "mongoConnectionString", error=True
@@ -63,7 +95,18 @@ async def run():
             "mongoDbName",
             fallback="dpytemplate_default_db",
         ),
+        **client_options,
     )
+    slow_query_log.start(
+        float(get_config_var("SLOW_QUERY_MS", config, "slow_query_ms", fallback=100))
+    )
+    await database_init.ensure_indexes()
+
+    # Documents can only be imported once the database instance exists.
+    from internal import migrations
+
+    await migrations.run_pending(migrations.STARTUP_MIGRATIONS)
+    await database_init.explain_report()
 
     bot = Bot(
         config=config,
@@ -74,6 +117,9 @@ async def run():
 
     bot.config = config
 
+    # MapData backfills run alongside the bot instead of delaying login.
+    bot.loop.create_task(migrations.run_background())
+
     try:
         token = get_config_var("BOT_TOKEN", config, "token", error=True)
         await bot.start(token)
@@ -0,0 +1,117 @@
+import datetime
+import random
+import timeit
+
+import pytest
+
+pytest.importorskip("discord")
+pytest.importorskip("motor")
+pytest.importorskip("umongo")
+
+from internal import database_init  # noqa: E402
+
+# Documents can only be imported once the database instance exists.
+if database_init.db is None:
+    database_init.init("mongodb://localhost:27017", "dfpk_test")
+
+from internal.pb_utils import display_record, display_records  # noqa: E402
+
+
+# Frozen copy of the timedelta based formatter display_record replaced.
+def old_display_record(record):
+    if old_check_negative(record):
+        return old_format_timedelta(record)
+    elif str(datetime.timedelta(seconds=record)).count(".") == 1:
+        return str(datetime.timedelta(seconds=record))[: -4 or None]
+    return str(datetime.timedelta(seconds=record)) + ".00"
+
+
+def old_check_negative(s):
+    try:
+        f = float(s)
+        if f < 0:
+            return True
+        return False
+    except ValueError:
+        return False
+
+
+def old_format_timedelta(td):
+    if datetime.timedelta(seconds=td) < datetime.timedelta(0):
+        return "-" + old_format_timedelta(-td)
+    else:
+        return str(td)
+
+
+def sample_records(count, seed=0):
+    """Records as submitted (hundredths), arbitrary floats, ints and negatives."""
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        kind = rng.randrange(5)
+        if kind == 0:
+            records.append(round(rng.uniform(0, 10_000), 2))
+        elif kind == 1:
+            records.append(rng.uniform(0, 400_000))
+        elif kind == 2:
+            records.append(rng.randrange(0, 400_000))
+        elif kind == 3:
+            records.append(-round(rng.uniform(0, 10_000), 2))
+        else:
+            records.append(rng.randrange(0, 10_000) + rng.choice((0.995, 0.005, 0.5)))
+    return records
+
+
+EDGE_CASES = [
+    0,
+    0.0,
+    0.01,
+    0.999999,
+    0.9999995,
+    59.99,
+    59.995,
+    60,
+    3599.99,
+    3600,
+    86399.99,
+    86399.9999999,
+    86400,
+    172800.5,
+    10 ** 7 + 0.01,
+    -0.01,
+    -1,
+    -86400.5,
+]
+
+
+@pytest.mark.parametrize("record", EDGE_CASES)
+def test_display_record_edge_cases(record):
+    assert display_record(record) == old_display_record(record)
+
+
+def test_display_record_matches_old_formatter():
+    for record in sample_records(50_000):
+        assert display_record(record) == old_display_record(record), record
+
+
+def test_display_records_formats_each_record():
+    records = sample_records(100, seed=1)
+    assert display_records(records) == [old_display_record(r) for r in records]
+
+
+def benchmark(number=5):
+    """Print the time both formatters take to format 100k records."""
+    records = sample_records(100_000)
+    for name, formatter in (("old", old_display_record), ("new", display_record)):
+        seconds = min(
+            timeit.repeat(
+                lambda: [formatter(record) for record in records],
+                number=1,
+                repeat=number,
+            )
+        )
+        print(f"{name}: {seconds * 1000:.0f} ms per {len(records)} records")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,171 @@
+import asyncio
+import time
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("discord")
+pytest.importorskip("pretty_help")
+
+from discord.state import ConnectionState  # noqa: E402
+from discord.user import ClientUser  # noqa: E402
+
+from internal.botclass import cache_options  # noqa: E402
+
+GUILD_ID = 1
+CHANNEL_ID = 2
+BOT_ID = 3
+TIMESTAMP = "2021-01-01T00:00:00+00:00"
+
+
+def user(user_id):
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id}",
+        "discriminator": "0001",
+        "avatar": None,
+    }
+
+
+def member(user_id):
+    return {
+        "user": user(user_id),
+        "roles": [],
+        "joined_at": TIMESTAMP,
+        "deaf": False,
+        "mute": False,
+    }
+
+
+def guild_create(intents, member_count):
+    """GUILD_CREATE as the gateway sends it for these intents.
+
+    Without the members intent only the bot's own member is included,
+    without presences no presences are. With both, every member is sent,
+    like a fully chunked guild.
+    """
+    user_ids = range(BOT_ID, BOT_ID + member_count)
+    return {
+        "id": str(GUILD_ID),
+        "name": "guild",
+        "owner_id": str(BOT_ID + 1),
+        "region": "us-east",
+        "member_count": member_count,
+        "large": False,
+        "unavailable": False,
+        "roles": [
+            {
+                "id": str(GUILD_ID),
+                "name": "@everyone",
+                "permissions": "0",
+                "position": 0,
+                "color": 0,
+                "hoist": False,
+                "managed": False,
+                "mentionable": False,
+            }
+        ],
+        "channels": [
+            {
+                "id": str(CHANNEL_ID),
+                "type": 0,
+                "name": "records",
+                "position": 0,
+                "permission_overwrites": [],
+            }
+        ],
+        "members": [member(user_id) for user_id in user_ids]
+        if intents.members
+        else [member(BOT_ID)],
+        "presences": [
+            {
+                "user": {"id": str(user_id)},
+                "status": "online",
+                "activities": [{"name": "Overwatch", "type": 0}],
+                "client_status": {"desktop": "online"},
+            }
+            for user_id in user_ids
+        ]
+        if intents.presences
+        else [],
+        "emojis": [],
+        "features": [],
+    }
+
+
+def message_create(message_id, author_id):
+    return {
+        "id": str(message_id),
+        "channel_id": str(CHANNEL_ID),
+        "guild_id": str(GUILD_ID),
+        "author": user(author_id),
+        "member": {k: v for k, v in member(author_id).items() if k != "user"},
+        "content": "/submitpb ABCDE 1 1:23.45",
+        "timestamp": TIMESTAMP,
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+
+def connect(config, member_count, message_count):
+    """Replay a connect and message_count messages into a ConnectionState."""
+    options = cache_options(config)
+    loop = asyncio.new_event_loop()
+    try:
+        state = ConnectionState(
+            dispatch=lambda *args, **kwargs: None,
+            handlers={},
+            hooks={},
+            syncer=None,
+            http=None,
+            loop=loop,
+            **options,
+        )
+        state.user = ClientUser(state=state, data={**user(BOT_ID), "bot": True})
+        state.parse_guild_create(guild_create(options["intents"], member_count))
+        for i in range(message_count):
+            state.parse_message_create(
+                message_create(10 ** 6 + i, BOT_ID + i % member_count)
+            )
+    finally:
+        loop.close()
+    return state
+
+
+@pytest.mark.parametrize(
+    "mode, members, messages",
+    [("minimal", 1, 250), ("all", 500, 1000)],
+)
+def test_cache_size_by_mode(mode, members, messages):
+    state = connect({"intents": mode}, member_count=500, message_count=2000)
+    guild = state._get_guild(GUILD_ID)
+    assert guild.member_count == 500
+    assert len(guild.members) == members
+    assert len(state._messages) == messages
+
+
+def benchmark(member_count=20_000, message_count=5_000):
+    """Print connect time and memory held by the cache in each mode."""
+    for mode in ("all", "minimal"):
+        tracemalloc.start()
+        started = time.perf_counter()
+        state = connect({"intents": mode}, member_count, message_count)
+        elapsed = time.perf_counter() - started
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        guild = state._get_guild(GUILD_ID)
+        print(
+            f"{mode}: {elapsed * 1000:.0f} ms, {size / 2 ** 20:.1f} MB, "
+            f"{len(guild.members)} members, {len(state._messages)} messages cached"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+discord = pytest.importorskip("discord")
+
+from internal import members  # noqa: E402
+
+
+def http_error(status):
+    response = SimpleNamespace(status=status, reason="error")
+    if status == 404:
+        return discord.NotFound(response, "Unknown Member")
+    return discord.HTTPException(response, "error")
+
+
+class StubGuild:
+    """Guild with an empty member cache whose REST lookups are scripted."""
+
+    def __init__(self, results):
+        self.id = 1
+        self.results = results
+        self.fetched = []
+        self.queried = []
+
+    def get_member(self, user_id):
+        return None
+
+    async def fetch_member(self, user_id):
+        self.fetched.append(user_id)
+        result = self.results[user_id]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def query_members(self, user_ids, limit, cache):
+        self.queried.append(user_ids)
+        return [
+            self.results[user_id]
+            for user_id in user_ids
+            if not isinstance(self.results[user_id], Exception)
+        ]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(members, "_fetched", members.OrderedDict())
+    monkeypatch.setattr(members, "_members_intent", False)
+
+
+def test_failed_fetches_leave_users_unresolved():
+    member = SimpleNamespace(id=10, name="player")
+    guild = StubGuild(
+        {
+            10: member,
+            11: http_error(404),
+            12: http_error(403),
+            13: http_error(500),
+            14: asyncio.TimeoutError(),
+        }
+    )
+
+    found = asyncio.run(members.resolve_members(guild, [10, 11, 12, 13, 14]))
+
+    assert found == {10: member, 11: None, 12: None, 13: None, 14: None}
+
+
+def test_missing_users_are_not_fetched_again():
+    guild = StubGuild({10: SimpleNamespace(id=10), 11: http_error(404)})
+
+    asyncio.run(members.resolve_members(guild, [10, 11]))
+    asyncio.run(members.resolve_members(guild, [10, 11]))
+
+    assert sorted(guild.fetched) == [10, 11]
+
+
+def test_failed_fetches_are_retried():
+    guild = StubGuild({12: http_error(500)})
+
+    asyncio.run(members.resolve_members(guild, [12]))
+    asyncio.run(members.resolve_members(guild, [12]))
+
+    assert guild.fetched == [12, 12]
+
+
+def test_members_intent_queries_the_gateway(monkeypatch):
+    monkeypatch.setattr(members, "_members_intent", True)
+    member = SimpleNamespace(id=10)
+    guild = StubGuild({10: member, 11: http_error(404)})
+
+    assert asyncio.run(members.resolve_members(guild, [10, 11])) == {
+        10: member,
+        11: None,
+    }
+    asyncio.run(members.resolve_members(guild, [11]))
+
+    assert guild.queried == [[10, 11]]
+    assert guild.fetched == []
@@ -0,0 +1,272 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("discord")
+pytest.importorskip("motor")
+pytest.importorskip("umongo")
+
+from internal import database_init  # noqa: E402
+
+# Documents can only be imported once the database instance exists.
+# The client does not connect until a query is sent.
+if database_init.db is None:
+    database_init.init("mongodb://localhost:27017", "dfpk_test")
+
+from internal import pb_utils  # noqa: E402
+
+
+class StubCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, length=None):
+        return self.rows
+
+
+class StubCollection:
+    """Records every pipeline passed to aggregate."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return StubCursor(self.rows)
+
+    def find(self, *args, **kwargs):
+        raise AssertionError("only aggregations are expected")
+
+    def find_one(self, *args, **kwargs):
+        raise AssertionError("only aggregations are expected")
+
+
+def rows(map_count):
+    return [
+        {
+            "code": f"CODE{i}",
+            "map_name": "Ayutthaya",
+            "creator": "someone",
+            "records": [{"level": "1", "record": 12.34, "verified": True}],
+        }
+        for i in range(map_count)
+    ]
+
+
+@pytest.mark.parametrize("map_count", [0, 1, 50])
+def test_personal_bests_uses_one_aggregation(monkeypatch, map_count):
+    collection = StubCollection(rows(map_count))
+    monkeypatch.setattr(
+        pb_utils, "WorldRecords", SimpleNamespace(collection=collection)
+    )
+
+    result = asyncio.run(pb_utils.personal_bests({"posted_by": 1}))
+
+    assert len(collection.pipelines) == 1
+    assert result == collection.rows
+
+
+def test_personal_bests_pages_inside_the_aggregation(monkeypatch):
+    collection = StubCollection(rows(5))
+    monkeypatch.setattr(
+        pb_utils, "WorldRecords", SimpleNamespace(collection=collection)
+    )
+
+    asyncio.run(pb_utils.personal_bests({"posted_by": 1}, after="CODE1", limit=5))
+
+    (pipeline,) = collection.pipelines
+    assert pipeline[0] == {
+        "$match": {"$and": [{"posted_by": 1}, {"code": {"$gt": "CODE1"}}]}
+    }
+    assert {"$limit": 5} in pipeline
+
+
+def _get(document, path):
+    for key in path.split("."):
+        document = document.get(key) if isinstance(document, dict) else None
+    return document
+
+
+def _value(document, expression):
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get(document, expression[1:])
+    if isinstance(expression, dict):
+        return {key: _value(document, value) for key, value in expression.items()}
+    return expression
+
+
+def run_pipeline(documents, pipeline):
+    """Evaluate the $match/$sort/$group/$project subset level_bests uses."""
+    for stage in pipeline:
+        ((name, spec),) = stage.items()
+        if name == "$match":
+            documents = [
+                document
+                for document in documents
+                if all(_get(document, key) == value for key, value in spec.items())
+            ]
+        elif name == "$sort":
+            for key, direction in reversed(list(spec.items())):
+                documents = sorted(
+                    documents,
+                    key=lambda document: _get(document, key),
+                    reverse=direction < 0,
+                )
+        elif name == "$group":
+            groups = {}
+            for document in documents:
+                key = _value(document, spec["_id"])
+                group = groups.setdefault(repr(key), {"_id": key})
+                for field, accumulator in spec.items():
+                    if field == "_id":
+                        continue
+                    ((operator, expression),) = accumulator.items()
+                    if operator == "$first":
+                        group.setdefault(field, _value(document, expression))
+                    elif operator == "$sum":
+                        group[field] = group.get(field, 0) + expression
+            documents = list(groups.values())
+        elif name == "$project":
+            documents = [
+                {
+                    field: document.get(field)
+                    if value is True
+                    else _value(document, value)
+                    for field, value in spec.items()
+                    if value is not False
+                }
+                for document in documents
+            ]
+        else:
+            raise AssertionError(f"unexpected stage {name}")
+    return documents
+
+
+class EvaluatingCollection(StubCollection):
+    """Runs aggregations against in-memory documents."""
+
+    def __init__(self, documents):
+        super().__init__([])
+        self.documents = documents
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return StubCursor(run_pipeline(self.documents, pipeline))
+
+
+def record(_id, code, level, record, verified):
+    return {
+        "_id": _id,
+        "code": code,
+        "level": level,
+        "level_key": level.upper(),
+        "name": f"player{_id}",
+        "record": record,
+        "url": f"https://example.com/{_id}",
+        "verified": verified,
+        "posted_by": _id,
+    }
+
+
+LEVEL_RECORDS = [
+    record(1, "AAAAA", "1", 30.5, True),
+    record(2, "AAAAA", "1", 29.0, True),
+    record(3, "AAAAA", "1", 10.0, False),
+    record(4, "AAAAA", "boss", 50.0, False),
+    record(5, "AAAAA", "Boss", 45.0, False),
+    record(6, "BBBBB", "1", 12.0, True),
+    record(7, "BBBBB", "1", 12.5, True),
+]
+
+
+def test_level_bests_groups_in_the_database(monkeypatch):
+    collection = EvaluatingCollection(LEVEL_RECORDS)
+    monkeypatch.setattr(
+        pb_utils, "WorldRecords", SimpleNamespace(collection=collection)
+    )
+
+    asyncio.run(pb_utils.level_bests({"code": "AAAAA"}))
+
+    ((match, sort, group, *_),) = collection.pipelines
+    assert match == {"$match": {"code": "AAAAA", "verified": True}}
+    assert list(sort["$sort"]) == ["code", "level_key", "verified", "record"]
+    assert group["$group"]["_id"] == {"code": "$code", "level_key": "$level_key"}
+    for field, accumulator in group["$group"].items():
+        if field not in ("_id", "count"):
+            assert list(accumulator) == ["$first"], field
+
+
+def test_level_bests_returns_one_document_per_level(monkeypatch):
+    collection = EvaluatingCollection(LEVEL_RECORDS)
+    monkeypatch.setattr(
+        pb_utils, "WorldRecords", SimpleNamespace(collection=collection)
+    )
+
+    bests = asyncio.run(pb_utils.level_bests({}, verified_only=False))
+
+    assert [
+        (best["code"], best["level_key"], best["_id"], best["count"]) for best in bests
+    ] == [
+        ("AAAAA", "1", 2, 3),
+        ("AAAAA", "BOSS", 5, 2),
+        ("BBBBB", "1", 6, 2),
+    ]
+    assert len(collection.pipelines) == 1
+
+
+def test_level_bests_verified_only(monkeypatch):
+    collection = EvaluatingCollection(LEVEL_RECORDS)
+    monkeypatch.setattr(
+        pb_utils, "WorldRecords", SimpleNamespace(collection=collection)
+    )
+
+    bests = asyncio.run(pb_utils.level_bests({}))
+
+    assert [(best["code"], best["level_key"], best["_id"]) for best in bests] == [
+        ("AAAAA", "1", 2),
+        ("BBBBB", "1", 6),
+    ]
+
+
+@pytest.mark.parametrize(
+    "time_input, centiseconds",
+    [
+        ("9999", 999900),
+        ("75:00", 450000),
+        ("100:00", 600000),
+        ("1:00:00", 360000),
+        ("1:02:03.45", 372345),
+        ("59.99", 5999),
+        ("1:05.5", 6550),
+        (".5", 50),
+        ("0.05", 5),
+        (" 12.3 ", 1230),
+    ],
+)
+def test_parse_centiseconds_accepts(time_input, centiseconds):
+    assert pb_utils.parse_centiseconds(time_input) == centiseconds
+
+
+@pytest.mark.parametrize(
+    "time_input",
+    [
+        "",
+        ".",
+        "1:",
+        ":30",
+        "1:75",
+        "1:60:00",
+        "100:00:00",
+        "1:2:3:4",
+        "1.234",
+        "-5",
+        "nan",
+        "inf",
+        "1e9",
+        "1:.5",
+    ],
+)
+def test_parse_centiseconds_rejects(time_input):
+    assert pb_utils.parse_centiseconds(time_input) is None